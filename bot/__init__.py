@@ -37,8 +37,57 @@ basicConfig(
 LOGGER = getLogger(__name__)
 cpu_no = cpu_count()
 
+
+class TaskDict(dict):
+    """task_dict keyed by mid that also indexes its tasks by gid"""
+
+    def __init__(self):
+        super().__init__()
+        self.gids = {}
+        self._task_gids = {}
+
+    def _index(self, tk):
+        try:
+            gid = tk.gid()
+        except Exception:
+            gid = None
+        self._unindex(tk)
+        if gid:
+            self.gids[gid] = tk
+            self._task_gids[id(tk)] = gid
+
+    def _unindex(self, tk):
+        gid = self._task_gids.pop(id(tk), None)
+        if gid is not None and self.gids.get(gid) is tk:
+            del self.gids[gid]
+
+    def reindex(self, tk):
+        if self.get(tk.listener.mid) is tk:
+            self._index(tk)
+
+    def __setitem__(self, key, tk):
+        if key in self:
+            self._unindex(self[key])
+        super().__setitem__(key, tk)
+        self._index(tk)
+
+    def __delitem__(self, key):
+        self._unindex(self[key])
+        super().__delitem__(key)
+
+    def pop(self, key, *args):
+        if key in self:
+            self._unindex(self[key])
+        return super().pop(key, *args)
+
+    def clear(self):
+        self.gids.clear()
+        self._task_gids.clear()
+        super().clear()
+
+
 DOWNLOAD_DIR = "/usr/src/app/downloads/"
-intervals = {"status": {}, "qb": "", "jd": "", "nzb": "", "stopAll": False}
+intervals = {"status": "", "qb": "", "jd": "", "nzb": "", "stopAll": False}
 qb_torrents = {}
 jd_downloads = {}
 nzb_jobs = {}
@@ -49,7 +98,7 @@ nzb_options = {}
 queued_dl = {}
 queued_up = {}
 status_dict = {}
-task_dict = {}
+task_dict = TaskDict()
 rss_dict = {}
 auth_chats = {}
 excluded_extensions = ["aria2", "!qB"]
@@ -34,6 +34,9 @@ async def main():
     from .core.jdownloader_booter import jdownloader
     from .helper.ext_utils.telegraph_helper import telegraph
     from .helper.mirror_leech_utils.rclone_utils.serve import rclone_serve_booter
+    from .helper.mirror_leech_utils.gdrive_utils.drive_index import (
+        drive_index_booter,
+    )
     from .modules import (
         initiate_search_tools,
         get_packages_version,
@@ -49,6 +52,7 @@ async def main():
         restart_notification(),
         telegraph.create_account(),
         rclone_serve_booter(),
+        drive_index_booter(),
     )
 
 
@@ -6,6 +6,8 @@ from bot import LOGGER
 
 
 class Config:
+    ARCHIVE_PRESET = "store"
+    ARCHIVE_THREADS = 0
     AS_DOCUMENT = False
     AUTHORIZED_CHATS = ""
     BASE_URL = ""
@@ -14,11 +16,14 @@ class Config:
     CMD_SUFFIX = ""
     DATABASE_URL = ""
     DEFAULT_UPLOAD = "rc"
+    DIRECT_PARALLEL_DOWNLOADS = 4
+    DRIVE_INDEX_INTERVAL = 0
     EQUAL_SPLITS = False
     EXCLUDED_EXTENSIONS = ""
     FFMPEG_CMDS = {}
     FILELION_API = ""
     GDRIVE_ID = ""
+    GDRIVE_UPLOAD_WORKERS = 4
     INCOMPLETE_TASK_NOTIFIER = False
     INDEX_URL = ""
     IS_TEAM_DRIVE = False
@@ -26,7 +31,11 @@ class Config:
     JD_PASS = ""
     LEECH_DUMP_CHAT = ""
     LEECH_FILENAME_PREFIX = ""
+    LEECH_GLOBAL_UPLOADS = 0
+    LEECH_PARALLEL_UPLOADS = 1
+    LEECH_PROCESS_WORKERS = 1
     LEECH_SPLIT_SIZE = 2097152000
+    LEECH_UPLOAD_CONNECTIONS = 1
     MEDIA_GROUP = False
     HYBRID_LEECH = False
     HYDRA_IP = ""
@@ -36,9 +45,12 @@ class Config:
     OWNER_ID = 0
     QUEUE_ALL = 0
     QUEUE_DOWNLOAD = 0
+    QUEUE_ENGINE_LIMITS = {}
+    QUEUE_POLICY = "fair"
     QUEUE_UPLOAD = 0
     RCLONE_FLAGS = ""
     RCLONE_PATH = ""
+    RCLONE_RCD = False
     RCLONE_SERVE_URL = ""
     RCLONE_SERVE_USER = ""
     RCLONE_SERVE_PASS = ""
@@ -50,9 +62,11 @@ class Config:
     SEARCH_LIMIT = 0
     SEARCH_PLUGINS = []
     STATUS_LIMIT = 4
+    STATUS_SNAPSHOT_TTL = 1
     STATUS_UPDATE_INTERVAL = 15
     STOP_DUPLICATE = False
     STREAMWISH_API = ""
+    STREAM_LEECH = False
     SUDO_USERS = ""
     TELEGRAM_API = 0
     TELEGRAM_HASH = ""
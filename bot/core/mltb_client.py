@@ -1,9 +1,131 @@
-from pyrogram import Client, enums
-from asyncio import Lock
+from pyrogram import Client, StopTransmission, enums, raw
+from asyncio import Lock, gather
+from inspect import iscoroutinefunction
+from os import open as osopen, close as osclose, pread, O_RDONLY, path as ospath
 
 from .. import LOGGER
 from .config_manager import Config
 
+PART_SIZE = 512 * 1024
+BIG_FILE_SIZE = 10 * 1024 * 1024
+WORKERS_PER_SESSION = 4
+
+
+class MltbClient(Client):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._saved_files = {}
+
+    async def preload_file(self, path, progress=None, progress_args=()):
+        """Uploads the bytes of `path` now and keeps the input file for the
+        next send of the same path, so messages can be sent in order later.
+        Returns False when the transmission was stopped."""
+        try:
+            self._saved_files[path] = await self.save_file(
+                path, progress=progress, progress_args=progress_args
+            )
+        except StopTransmission:
+            return False
+        return True
+
+    def forget_file(self, path):
+        self._saved_files.pop(path, None)
+
+    async def save_file(self, path, *args, **kwargs):
+        if isinstance(path, str) and (saved := self._saved_files.pop(path, None)):
+            return saved
+        connections = Config.LEECH_UPLOAD_CONNECTIONS
+        if (
+            connections < 2
+            or args
+            or kwargs.get("file_id")
+            or kwargs.get("file_part")
+            or not isinstance(path, str)
+            or ospath.getsize(path) <= BIG_FILE_SIZE
+        ):
+            return await super().save_file(path, *args, **kwargs)
+        async with self.save_file_semaphore:
+            if sessions := await self._get_upload_sessions(connections):
+                return await self._save_big_file(
+                    path,
+                    sessions,
+                    kwargs.get("progress"),
+                    kwargs.get("progress_args", ()),
+                )
+        # save_file takes the semaphore itself
+        return await super().save_file(path, *args, **kwargs)
+
+    async def _get_upload_sessions(self, connections):
+        """Starts `connections` temporary media sessions to the home DC, or
+        returns None when one can't be made so the upload uses pyrogram's."""
+        dc_id = await self.storage.dc_id()
+        sessions = []
+        try:
+            for _ in range(connections):
+                sessions.append(
+                    await self.get_session(dc_id, is_media=True, temporary=True)
+                )
+        except Exception as e:
+            LOGGER.warning(f"Unable to open upload connections: {e}")
+            await gather(
+                *(session.stop() for session in sessions), return_exceptions=True
+            )
+            return None
+        return sessions
+
+    async def _save_big_file(self, path, sessions, progress, progress_args):
+        file_size = ospath.getsize(path)
+        file_total_parts = -(-file_size // PART_SIZE)
+        file_id = self.rnd_id()
+        parts = iter(range(file_total_parts))
+        uploaded = 0
+        fd = osopen(path, O_RDONLY)
+
+        async def worker(session):
+            nonlocal uploaded
+            while (part := next(parts, None)) is not None:
+                chunk = await self.loop.run_in_executor(
+                    self.executor, pread, fd, PART_SIZE, part * PART_SIZE
+                )
+                await session.invoke(
+                    raw.functions.upload.SaveBigFilePart(
+                        file_id=file_id,
+                        file_part=part,
+                        file_total_parts=file_total_parts,
+                        bytes=chunk,
+                    )
+                )
+                uploaded += len(chunk)
+                if progress is None:
+                    continue
+                if iscoroutinefunction(progress):
+                    await progress(uploaded, file_size, *progress_args)
+                else:
+                    await self.loop.run_in_executor(
+                        self.executor, progress, uploaded, file_size, *progress_args
+                    )
+
+        tasks = []
+        try:
+            tasks = [
+                self.loop.create_task(worker(session))
+                for session in sessions
+                for _ in range(WORKERS_PER_SESSION)
+            ]
+            await gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+        finally:
+            await gather(
+                *(session.stop() for session in sessions), return_exceptions=True
+            )
+            osclose(fd)
+        return raw.types.InputFileBig(
+            id=file_id, parts=file_total_parts, name=ospath.basename(path)
+        )
+
 
 class TgClient:
     _lock = Lock()
@@ -18,7 +140,7 @@ class TgClient:
     async def start_bot(cls):
         LOGGER.info("Creating client from BOT_TOKEN")
         cls.ID = Config.BOT_TOKEN.split(":", 1)[0]
-        cls.bot = Client(
+        cls.bot = MltbClient(
             cls.ID,
             Config.TELEGRAM_API,
             Config.TELEGRAM_HASH,
@@ -36,7 +158,7 @@ class TgClient:
         if Config.USER_SESSION_STRING:
             LOGGER.info("Creating client from USER_SESSION_STRING")
             try:
-                cls.user = Client(
+                cls.user = MltbClient(
                     "user",
                     Config.TELEGRAM_API,
                     Config.TELEGRAM_HASH,
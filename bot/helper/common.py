@@ -1,5 +1,5 @@
 from aiofiles.os import path as aiopath, remove, makedirs, listdir
-from asyncio import sleep, gather
+from asyncio import sleep, gather, Semaphore
 from os import walk, path as ospath
 from secrets import token_urlsafe
 from aioshutil import move, rmtree
@@ -17,6 +17,7 @@ from .. import (
     task_dict,
     excluded_extensions,
     cpu_eater_lock,
+    cpu_no,
     intervals,
     DOWNLOAD_DIR,
 )
@@ -30,12 +31,12 @@ from .mirror_leech_utils.status_utils.sevenz_status import SevenZStatus
 from .mirror_leech_utils.status_utils.ffmpeg_status import FFmpegStatus
 from .telegram_helper.bot_commands import BotCommands
 from .ext_utils.files_utils import (
+    get_archive_ext,
     get_base_name,
     is_first_archive_split,
     is_archive,
     is_archive_split,
     get_path_size,
-    split_file,
     SevenZ,
 )
 from .ext_utils.links_utils import (
@@ -117,6 +118,7 @@ class TaskConfig:
         self.ffmpeg_cmds = None
         self.chat_thread_id = None
         self.subproc = None
+        self.streamer = None
         self.thumb = None
         self.excluded_extensions = []
         self.files_to_proceed = []
@@ -618,35 +620,69 @@ class TaskConfig:
         LOGGER.info(f"Extracting: {self.name}")
         async with task_dict_lock:
             task_dict[self.mid] = SevenZStatus(self, sevenz, gid, "Extract")
+        dirs = []
         for dirpath, _, files in await sync_to_async(
             walk, self.up_dir or self.dir, topdown=False
         ):
-            code = 0
-            for file_ in files:
+            archives = [
+                file_
+                for file_ in files
+                if is_first_archive_split(file_)
+                or is_archive(file_)
+                and not file_.strip().lower().endswith(".rar")
+            ]
+            dirs.append((dirpath, files, archives))
+        # independent archives run side by side, each 7z with its own -mmt
+        # share of the cpus, while holding cpu_eater_lock like ffmpeg does
+        threads = Config.ARCHIVE_THREADS or 1
+        workers = max(1, min(sum(len(a) for *_, a in dirs), cpu_no // threads))
+        semaphore = Semaphore(workers)
+
+        async def extract(dirpath, file_):
+            async with semaphore:
                 if self.is_cancelled:
                     return False
-                if (
-                    is_first_archive_split(file_)
-                    or is_archive(file_)
-                    and not file_.strip().lower().endswith(".rar")
-                ):
+                self.proceed_count += 1
+                f_path = ospath.join(dirpath, file_)
+                if self.is_file:
+                    t_path = get_base_name(f_path)
+                else:
+                    t_path = dirpath
+                    self.subname = file_
+                code = await sevenz.extract(
+                    f_path, t_path, pswd, threads if workers > 1 else 0
+                )
+                return code, t_path
 
-                    self.proceed_count += 1
-                    f_path = ospath.join(dirpath, file_)
-                    t_path = get_base_name(f_path) if self.is_file else dirpath
-                    if not self.is_file:
-                        self.subname = file_
-                    code = await sevenz.extract(f_path, t_path, pswd)
-            if self.is_cancelled:
-                return code
-            if code == 0:
-                for file_ in files:
-                    if is_archive_split(file_) or is_archive(file_):
-                        del_path = ospath.join(dirpath, file_)
-                        try:
-                            await remove(del_path)
-                        except:
-                            self.is_cancelled = True
+        if workers > 1:
+            self.progress = False
+            await cpu_eater_lock.acquire()
+            self.progress = True
+        try:
+            results = await gather(
+                *(
+                    gather(*(extract(dirpath, file_) for file_ in archives))
+                    for dirpath, _, archives in dirs
+                )
+            )
+        finally:
+            if workers > 1:
+                cpu_eater_lock.release()
+        if self.is_cancelled:
+            return False
+        code = 0
+        for (dirpath, files, _), res in zip(dirs, results):
+            if res:
+                code, t_path = res[-1]
+            if any(c != 0 for c, _ in res):
+                continue
+            for file_ in files:
+                if is_archive_split(file_) or is_archive(file_):
+                    del_path = ospath.join(dirpath, file_)
+                    try:
+                        await remove(del_path)
+                    except:
+                        self.is_cancelled = True
         if self.proceed_count == 0:
             LOGGER.info("No files able to extract!")
         return t_path if self.is_file and code == 0 else dl_path
@@ -886,43 +922,70 @@ class TaskConfig:
                         await take_ss(f_path, ss_nb)
         return dl_path
 
-    async def convert_media(self, dl_path, gid):
-        fvext = []
-        if self.convert_video:
-            vdata = self.convert_video.split()
-            vext = vdata[0].lower()
-            if len(vdata) > 2:
-                if "+" in vdata[1].split():
-                    vstatus = "+"
-                elif "-" in vdata[1].split():
-                    vstatus = "-"
+    def convert_options(self):
+        """Returns the target extension, `+`/`-` filter and filtered
+        extensions of the video and of the audio conversion."""
+        options = {}
+        for f_type, data in (
+            ("video", self.convert_video),
+            ("audio", self.convert_audio),
+        ):
+            if not data:
+                options[f_type] = ("", "", [])
+                continue
+            data = data.split()
+            ext = data[0].lower()
+            if len(data) > 2:
+                if "+" in data[1].split():
+                    status = "+"
+                elif "-" in data[1].split():
+                    status = "-"
                 else:
-                    vstatus = ""
-                fvext.extend(f".{ext.lower()}" for ext in vdata[2:])
+                    status = ""
+                exts = [f".{e.lower()}" for e in data[2:]]
             else:
-                vstatus = ""
-        else:
-            vext = ""
-            vstatus = ""
+                status = ""
+                exts = []
+            options[f_type] = (ext, status, exts)
+        return options
 
-        faext = []
-        if self.convert_audio:
-            adata = self.convert_audio.split()
-            aext = adata[0].lower()
-            if len(adata) > 2:
-                if "+" in adata[1].split():
-                    astatus = "+"
-                elif "-" in adata[1].split():
-                    astatus = "-"
-                else:
-                    astatus = ""
-                faext.extend(f".{ext.lower()}" for ext in adata[2:])
-            else:
-                astatus = ""
-        else:
-            aext = ""
-            astatus = ""
+    async def get_convert_type(self, f_path, options):
+        """Returns ("video" or "audio", target extension) when the file has to
+        be converted, otherwise None."""
+        vext, vstatus, fvext = options["video"]
+        aext, astatus, faext = options["audio"]
+        is_video, is_audio, _ = await get_document_type(f_path)
+        if (
+            is_video
+            and vext
+            and not f_path.strip().lower().endswith(f".{vext}")
+            and (
+                vstatus == "+"
+                and f_path.strip().lower().endswith(tuple(fvext))
+                or vstatus == "-"
+                and not f_path.strip().lower().endswith(tuple(fvext))
+                or not vstatus
+            )
+        ):
+            return "video", vext
+        elif (
+            is_audio
+            and aext
+            and not is_video
+            and not f_path.strip().lower().endswith(f".{aext}")
+            and (
+                astatus == "+"
+                and f_path.strip().lower().endswith(tuple(faext))
+                or astatus == "-"
+                and not f_path.strip().lower().endswith(tuple(faext))
+                or not astatus
+            )
+        ):
+            return "audio", aext
+        return None
 
+    async def convert_media(self, dl_path, gid):
+        options = self.convert_options()
         self.files_to_proceed = {}
         all_files = []
         if self.is_file:
@@ -934,34 +997,8 @@ class TaskConfig:
                     all_files.append(f_path)
 
         for f_path in all_files:
-            is_video, is_audio, _ = await get_document_type(f_path)
-            if (
-                is_video
-                and vext
-                and not f_path.strip().lower().endswith(f".{vext}")
-                and (
-                    vstatus == "+"
-                    and f_path.strip().lower().endswith(tuple(fvext))
-                    or vstatus == "-"
-                    and not f_path.strip().lower().endswith(tuple(fvext))
-                    or not vstatus
-                )
-            ):
-                self.files_to_proceed[f_path] = "video"
-            elif (
-                is_audio
-                and aext
-                and not is_video
-                and not f_path.strip().lower().endswith(f".{aext}")
-                and (
-                    astatus == "+"
-                    and f_path.strip().lower().endswith(tuple(faext))
-                    or astatus == "-"
-                    and not f_path.strip().lower().endswith(tuple(faext))
-                    or not astatus
-                )
-            ):
-                self.files_to_proceed[f_path] = "audio"
+            if convert := await self.get_convert_type(f_path, options):
+                self.files_to_proceed[f_path] = convert
         del all_files
 
         if self.files_to_proceed:
@@ -971,7 +1008,7 @@ class TaskConfig:
             self.progress = False
             async with cpu_eater_lock:
                 self.progress = True
-                for f_path, f_type in self.files_to_proceed.items():
+                for f_path, (f_type, ext) in self.files_to_proceed.items():
                     self.proceed_count += 1
                     LOGGER.info(f"Converting: {f_path}")
                     if self.is_file:
@@ -980,9 +1017,9 @@ class TaskConfig:
                         self.subsize = await get_path_size(f_path)
                         self.subname = ospath.basename(f_path)
                     if f_type == "video":
-                        res = await ffmpeg.convert_video(f_path, vext)
+                        res = await ffmpeg.convert_video(f_path, ext)
                     else:
-                        res = await ffmpeg.convert_audio(f_path, aext)
+                        res = await ffmpeg.convert_audio(f_path, ext)
                     if res:
                         try:
                             await remove(f_path)
@@ -1051,55 +1088,11 @@ class TaskConfig:
             new_dl_path = f"{new_folder}/{name}"
             await move(dl_path, new_dl_path)
             dl_path = new_dl_path
-            up_path = f"{new_dl_path}.zip"
+            up_path = f"{new_dl_path}.{get_archive_ext()}"
             self.is_file = False
         else:
-            up_path = f"{dl_path}.zip"
+            up_path = f"{dl_path}.{get_archive_ext()}"
         sevenz = SevenZ(self)
         async with task_dict_lock:
             task_dict[self.mid] = SevenZStatus(self, sevenz, gid, "Zip")
         return await sevenz.zip(dl_path, up_path, pswd)
-
-    async def proceed_split(self, dl_path, gid):
-        self.files_to_proceed = {}
-        if self.is_file:
-            f_size = await get_path_size(dl_path)
-            if f_size > self.split_size:
-                self.files_to_proceed[dl_path] = [f_size, ospath.basename(dl_path)]
-        else:
-            for dirpath, _, files in await sync_to_async(walk, dl_path, topdown=False):
-                for file_ in files:
-                    f_path = ospath.join(dirpath, file_)
-                    f_size = await get_path_size(f_path)
-                    if f_size > self.split_size:
-                        self.files_to_proceed[f_path] = [f_size, file_]
-        if self.files_to_proceed:
-            ffmpeg = FFMpeg(self)
-            async with task_dict_lock:
-                task_dict[self.mid] = FFmpegStatus(self, ffmpeg, gid, "Split")
-            LOGGER.info(f"Splitting: {self.name}")
-            for f_path, (f_size, file_) in self.files_to_proceed.items():
-                self.proceed_count += 1
-                if self.is_file:
-                    self.subsize = self.size
-                else:
-                    self.subsize = f_size
-                    self.subname = file_
-                parts = -(-f_size // self.split_size)
-                if self.equal_splits:
-                    split_size = (f_size // parts) + (f_size % parts)
-                else:
-                    split_size = self.split_size
-                if not self.as_doc and (await get_document_type(f_path))[0]:
-                    self.progress = True
-                    res = await ffmpeg.split(f_path, file_, parts, split_size)
-                else:
-                    self.progress = False
-                    res = await split_file(f_path, split_size, self)
-                if self.is_cancelled:
-                    return False
-                if res or f_size >= self.max_split_size:
-                    try:
-                        await remove(f_path)
-                    except:
-                        self.is_cancelled = True
@@ -7,7 +7,10 @@ from asyncio import (
     create_subprocess_shell,
     run_coroutine_threadsafe,
     sleep,
+    wait_for,
 )
+from re import compile as re_compile
+from time import time
 
 from ... import user_data, bot_loop
 from ...core.config_manager import Config
@@ -23,6 +26,8 @@ COMMAND_USAGE = {}
 
 THREAD_POOL = ThreadPoolExecutor(max_workers=500)
 
+PROGRESS_INTERVAL = 0.5
+
 
 class SetInterval:
     def __init__(self, interval, action, *args, **kwargs):
@@ -224,6 +229,30 @@ async def cmd_exec(cmd, shell=False):
     return stdout, stderr, proc.returncode
 
 
+async def read_records(
+    stream, separator=rb"\r?\n", interval=PROGRESS_INTERVAL, timeout=None
+):
+    """Reads a subprocess pipe in bulk and yields its complete records in
+    batches, at most every `interval` seconds. Reading never pauses, so the
+    writer can't block on a full pipe. Raises TimeoutError when nothing
+    arrives for `timeout` seconds."""
+    separator = re_compile(separator)
+    buffer = b""
+    records = []
+    last_yield = 0
+    while chunk := await wait_for(stream.read(65536), timeout):
+        *complete, buffer = separator.split(buffer + chunk)
+        records.extend(record for record in complete if record)
+        if records and time() - last_yield >= interval:
+            yield records
+            records = []
+            last_yield = time()
+    if buffer:
+        records.append(buffer)
+    if records:
+        yield records
+
+
 def new_task(func):
     @wraps(func)
     async def wrapper(*args, **kwargs):
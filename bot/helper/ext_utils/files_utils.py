@@ -1,8 +1,29 @@
 from aioshutil import rmtree as aiormtree, move
-from asyncio import create_subprocess_exec, sleep, wait_for
+from asyncio import create_subprocess_exec
 from asyncio.subprocess import PIPE
+from fcntl import ioctl
 from magic import Magic
-from os import walk, path as ospath, readlink
+from os import (
+    walk,
+    path as ospath,
+    readlink,
+    scandir,
+    stat,
+    open as osopen,
+    close,
+    lseek,
+    copy_file_range,
+    sendfile,
+    remove as osremove,
+    O_RDONLY,
+    O_WRONLY,
+    O_CREAT,
+    O_TRUNC,
+    SEEK_SET,
+)
+from struct import pack
+from time import time
+from threading import local
 from re import split as re_split, I, search as re_search, escape
 from aiofiles.os import (
     remove,
@@ -15,9 +36,11 @@ from aiofiles.os import (
 )
 
 from ... import LOGGER, DOWNLOAD_DIR
+from ...core.config_manager import Config
 from ...core.torrent_manager import TorrentManager
-from .bot_utils import sync_to_async, cmd_exec
+from .bot_utils import sync_to_async, read_records
 from .exceptions import NotSupportedExtractionArchive
+from .status_utils import get_readable_file_size, get_readable_time
 
 ARCH_EXT = [
     ".tar.bz2",
@@ -86,6 +109,34 @@ ARCH_EXT = [
     ".crc64",
 ]
 
+# detected from the extension only, magic is used for everything else
+MIME_TYPES = {
+    ".mkv": "video/x-matroska",
+    ".mp4": "video/mp4",
+    ".m4v": "video/x-m4v",
+    ".webm": "video/webm",
+    ".avi": "video/x-msvideo",
+    ".mov": "video/quicktime",
+    ".mp3": "audio/mpeg",
+    ".m4a": "audio/mp4",
+    ".flac": "audio/flac",
+    ".opus": "audio/ogg",
+    ".wav": "audio/x-wav",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".png": "image/png",
+    ".gif": "image/gif",
+    ".webp": "image/webp",
+    ".zip": "application/zip",
+    ".7z": "application/x-7z-compressed",
+    ".rar": "application/x-rar",
+    ".tar": "application/x-tar",
+    ".gz": "application/gzip",
+    ".pdf": "application/pdf",
+}
+
+_magic = local()
+
 
 FIRST_SPLIT_REGEX = (
     r"\.part0*1\.rar$|\.7z\.0*1$|\.zip\.0*1$|^(?!.*\.part\d+\.rar$).*\.rar$"
@@ -163,6 +214,97 @@ async def get_path_size(opath):
     return total_size
 
 
+class DirManifest:
+    """(path, size, is_link, mtime) of every file under a path.
+
+    Only directories whose mtime changed since the last refresh are scanned
+    again, so each stage pays for the files it created, renamed or removed.
+    Symlinked files get the size of their target, like get_path_size.
+    refresh() returns the total size of the path.
+    """
+
+    def __init__(self, path):
+        self.path = path.rstrip("/")
+        self._dirs = {}
+
+    def _scan_dir(self, dpath, seen):
+        try:
+            mtime = stat(dpath).st_mtime_ns
+        except OSError:
+            return
+        seen.add(dpath)
+        cached = self._dirs.get(dpath)
+        if cached is None or cached[0] != mtime:
+            files = {}
+            subdirs = []
+            with scandir(dpath) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.path)
+                        elif entry.is_file():
+                            st = entry.stat()
+                            files[entry.path] = (
+                                st.st_size,
+                                entry.is_symlink(),
+                                st.st_mtime,
+                            )
+                    except OSError:
+                        continue
+            cached = self._dirs[dpath] = (mtime, files, subdirs)
+        for subdir in cached[2]:
+            self._scan_dir(subdir, seen)
+
+    def _refresh(self):
+        if not ospath.isdir(self.path):
+            try:
+                st = stat(self.path)
+            except OSError:
+                self._dirs = {}
+                return
+            self._dirs = {
+                ospath.dirname(self.path): (
+                    None,
+                    {
+                        self.path: (
+                            st.st_size,
+                            ospath.islink(self.path),
+                            st.st_mtime,
+                        )
+                    },
+                    [],
+                )
+            }
+            return
+        seen = set()
+        self._scan_dir(self.path, seen)
+        for dpath in list(self._dirs):
+            if dpath not in seen:
+                del self._dirs[dpath]
+
+    async def refresh(self):
+        await sync_to_async(self._refresh)
+        return self.get_size()
+
+    def files(self, opath=None):
+        opath = (opath or self.path).rstrip("/")
+        parent = ospath.dirname(opath)
+        if parent in self._dirs and opath in self._dirs[parent][1]:
+            yield (opath, *self._dirs[parent][1][opath])
+            return
+        prefix = f"{opath}/"
+        for dpath, (_, files, _) in self._dirs.items():
+            if dpath == opath or dpath.startswith(prefix):
+                for f_path, entry in files.items():
+                    yield (f_path, *entry)
+
+    def get_size(self, opath=None):
+        return sum(entry[1] for entry in self.files(opath))
+
+    def count(self, opath=None):
+        return sum(1 for _ in self.files(opath))
+
+
 async def count_files_and_folders(opath):
     total_files = 0
     total_folders = 0
@@ -198,11 +340,18 @@ async def create_recursive_symlink(source, destination):
             LOGGER.error(f"Error creating shortcut for {source}: {e}")
 
 
+def _get_magic():
+    if (mime := getattr(_magic, "mime", None)) is None:
+        mime = _magic.mime = Magic(mime=True)
+    return mime
+
+
 def get_mime_type(file_path):
     if ospath.islink(file_path):
         file_path = readlink(file_path)
-    mime = Magic(mime=True)
-    mime_type = mime.from_file(file_path)
+    if mime_type := MIME_TYPES.get(ospath.splitext(file_path)[1].lower()):
+        return mime_type
+    mime_type = _get_magic().from_file(file_path)
     mime_type = mime_type or "text/plain"
     return mime_type
 
@@ -234,6 +383,81 @@ async def move_and_merge(source, destination, mid):
             await move(src_path, dest_path)
 
 
+FICLONERANGE = 0x4020940D
+COPY_CHUNK = 64 * 1024 * 1024
+
+
+def _copy_range(src, dst, src_offset, length, dst_offset, listener=None):
+    # a reflink shares the extents on btrfs/xfs, otherwise copy_file_range
+    # keeps the copy in the kernel and sendfile covers older kernels
+    try:
+        ioctl(dst, FICLONERANGE, pack("qQQQ", src, src_offset, length, dst_offset))
+        return True
+    except OSError:
+        pass
+    lseek(dst, dst_offset, SEEK_SET)
+    while length > 0:
+        if listener is not None and listener.is_cancelled:
+            return False
+        count = min(length, COPY_CHUNK)
+        try:
+            sent = copy_file_range(src, dst, count, src_offset)
+        except OSError:
+            sent = sendfile(dst, src, src_offset, count)
+        if not sent:
+            raise OSError(f"Unexpected end of file at {src_offset}")
+        src_offset += sent
+        length -= sent
+    return True
+
+
+def _write_ranges(out_path, ranges, listener=None):
+    """Writes (fd, offset, length) ranges one after another into out_path."""
+    dst = osopen(out_path, O_WRONLY | O_CREAT | O_TRUNC, 0o644)
+    try:
+        dst_offset = 0
+        for src, offset, length in ranges:
+            if not _copy_range(src, dst, offset, length, dst_offset, listener):
+                return False
+            dst_offset += length
+        return True
+    finally:
+        close(dst)
+
+
+def _join_parts(fpath, parts):
+    fds = [osopen(part, O_RDONLY) for part in parts]
+    try:
+        _write_ranges(fpath, [(fd, 0, ospath.getsize(p)) for fd, p in zip(fds, parts)])
+    finally:
+        for fd in fds:
+            close(fd)
+
+
+def _split_file(f_path, split_size, listener):
+    size = ospath.getsize(f_path)
+    parts = []
+    src = osopen(f_path, O_RDONLY)
+    try:
+        for index, offset in enumerate(range(0, size, split_size), start=1):
+            parts.append(f"{f_path}.{index:03}")
+            length = min(split_size, size - offset)
+            if not _write_ranges(parts[-1], [(src, offset, length)], listener):
+                break
+        else:
+            return True
+    except OSError as e:
+        LOGGER.error(f"{e}. Split Document: {f_path}")
+    finally:
+        close(src)
+    for part in parts:
+        try:
+            osremove(part)
+        except OSError:
+            pass
+    return False
+
+
 async def join_files(opath):
     files = await listdir(opath)
     results = []
@@ -245,10 +469,16 @@ async def join_files(opath):
             exists = True
             final_name = file_.rsplit(".", 1)[0]
             fpath = f"{opath}/{final_name}"
-            cmd = f'cat "{fpath}."* > "{fpath}"'
-            _, stderr, code = await cmd_exec(cmd, True)
-            if code != 0:
-                LOGGER.error(f"Failed to join {final_name}, stderr: {stderr}")
+            parts = sorted(
+                (f for f in files if re_search(rf"^{escape(final_name)}\.\d+$", f)),
+                key=lambda f: int(f.rsplit(".", 1)[1]),
+            )
+            try:
+                await sync_to_async(
+                    _join_parts, fpath, [f"{opath}/{part}" for part in parts]
+                )
+            except OSError as e:
+                LOGGER.error(f"Failed to join {final_name}, error: {e}")
                 if await aiopath.isfile(fpath):
                     await remove(fpath)
             else:
@@ -265,92 +495,94 @@ async def join_files(opath):
 
 
 async def split_file(f_path, split_size, listener):
-    out_path = f"{f_path}."
     if listener.is_cancelled:
         return False
-    listener.subproc = await create_subprocess_exec(
-        "split",
-        "--numeric-suffixes=1",
-        "--suffix-length=3",
-        f"--bytes={split_size}",
-        f_path,
-        out_path,
-        stderr=PIPE,
-    )
-    _, stderr = await listener.subproc.communicate()
-    code = listener.subproc.returncode
+    res = await sync_to_async(_split_file, f_path, split_size, listener)
     if listener.is_cancelled:
         return False
-    if code == -9:
-        listener.is_cancelled = True
-        return False
-    elif code != 0:
-        try:
-            stderr = stderr.decode().strip()
-        except:
-            stderr = "Unable to decode the error!"
-        LOGGER.error(f"{stderr}. Split Document: {f_path}")
-    return True
+    return res
+
+
+ARCHIVE_PRESETS = {
+    "store": ("zip", ["-mx=0"]),
+    "fast": ("zip", ["-mx=1"]),
+    "zstd": ("7z", ["-m0=zstd", "-mx=1"]),
+}
+
+
+def get_archive_ext():
+    return ARCHIVE_PRESETS.get(Config.ARCHIVE_PRESET, ARCHIVE_PRESETS["store"])[0]
 
 
 class SevenZ:
     def __init__(self, listener):
         self._listener = listener
-        self._processed_bytes = 0
-        self._percentage = "0%"
+        self._procs = []
+        self._stages = {}
 
     @property
     def processed_bytes(self):
-        return self._processed_bytes
+        return sum(
+            stage["pct"] / 100 * stage["size"] for stage in self._stages.values()
+        )
 
     @property
     def progress(self):
-        return self._percentage
-
-    async def _sevenz_progress(self):
-        pattern = r"(\d+)\s+bytes|Total Physical Size\s*=\s*(\d+)"
-        while not (
-            self._listener.subproc.returncode is not None
-            or self._listener.is_cancelled
-            or self._listener.subproc.stdout.at_eof()
-        ):
-            try:
-                line = await wait_for(self._listener.subproc.stdout.readline(), 2)
-            except:
-                break
-            line = line.decode().strip()
-            if match := re_search(pattern, line):
-                self._listener.subsize = int(match[1] or match[2])
-            await sleep(0.05)
-        s = b""
-        while not (
-            self._listener.is_cancelled
-            or self._listener.subproc.returncode is not None
-            or self._listener.subproc.stdout.at_eof()
-        ):
-            try:
-                char = await wait_for(self._listener.subproc.stdout.read(1), 60)
-            except:
-                break
-            if not char:
+        if not self._stages:
+            return "0%"
+        if size := sum(stage["size"] for stage in self._stages.values()):
+            return f"{round(self.processed_bytes / size * 100)}%"
+        pct = sum(stage["pct"] for stage in self._stages.values())
+        return f"{round(pct / len(self._stages))}%"
+
+    # the listener keeps this object as its subproc, so cancelling a task
+    # kills every 7z it runs at once
+    @property
+    def returncode(self):
+        return None if any(p.returncode is None for p in self._procs) else 0
+
+    def kill(self):
+        for proc in self._procs:
+            if proc.returncode is None:
+                proc.kill()
+
+    async def _sevenz_progress(self, proc, stage):
+        size_pattern = r"(\d+)\s+bytes|Total Physical Size\s*=\s*(\d+)"
+        async for records in read_records(proc.stdout, rb"[\r\n\x08]+"):
+            if self._listener.is_cancelled:
                 break
-            s += char
-            if char == b"%":
-                try:
-                    self._percentage = s.decode().rsplit(" ", 1)[-1].strip()
-                    self._processed_bytes = (
-                        int(self._percentage.strip("%")) / 100
-                    ) * self._listener.subsize
-                except:
-                    self._processed_bytes = 0
-                    self._percentage = "0%"
-                s = b""
-            await sleep(0.05)
-
-        self._processed_bytes = 0
-        self._percentage = "0%"
-
-    async def extract(self, f_path, t_path, pswd):
+            for record in records:
+                record = record.decode(errors="ignore")
+                if match := re_search(size_pattern, record):
+                    stage["size"] = int(match[1] or match[2])
+                    self._listener.subsize = sum(
+                        stage["size"] for stage in self._stages.values()
+                    )
+                elif match := re_search(r"(\d+)%", record):
+                    stage["pct"] = int(match[1])
+
+    async def _run(self, cmd, path, name):
+        proc = await create_subprocess_exec(*cmd, stdout=PIPE, stderr=PIPE)
+        self._procs.append(proc)
+        self._listener.subproc = self
+        self._stages[path] = stage = {"pct": 0, "size": 0}
+        start_time = time()
+        try:
+            await self._sevenz_progress(proc, stage)
+            _, stderr = await proc.communicate()
+        finally:
+            self._procs.remove(proc)
+            del self._stages[path]
+        if proc.returncode == 0 and stage["size"]:
+            elapsed = max(time() - start_time, 0.001)
+            LOGGER.info(
+                f"{name}: {get_readable_file_size(stage['size'])} in "
+                f"{get_readable_time(elapsed) or '0s'} "
+                f"({get_readable_file_size(stage['size'] / elapsed)}/s). Path: {path}"
+            )
+        return proc.returncode, stderr
+
+    async def extract(self, f_path, t_path, pswd, threads=0):
         cmd = [
             "7z",
             "x",
@@ -363,18 +595,13 @@ class SevenZ:
             "-bse1",
             "-bb3",
         ]
+        if threads := threads or Config.ARCHIVE_THREADS:
+            cmd.append(f"-mmt{threads}")
         if not pswd:
             del cmd[2]
         if self._listener.is_cancelled:
             return False
-        self._listener.subproc = await create_subprocess_exec(
-            *cmd,
-            stdout=PIPE,
-            stderr=PIPE,
-        )
-        await self._sevenz_progress()
-        _, stderr = await self._listener.subproc.communicate()
-        code = self._listener.subproc.returncode
+        code, stderr = await self._run(cmd, f_path, "Extract")
         if self._listener.is_cancelled:
             return False
         if code == -9:
@@ -395,11 +622,14 @@ class SevenZ:
             split_size = (size // parts) + (size % parts)
         else:
             split_size = self._listener.split_size
+        _, preset = ARCHIVE_PRESETS.get(
+            Config.ARCHIVE_PRESET, ARCHIVE_PRESETS["store"]
+        )
         cmd = [
             "7z",
             f"-v{split_size}b",
             "a",
-            "-mx=0",
+            *preset,
             f"-p{pswd}",
             up_path,
             dl_path,
@@ -407,23 +637,18 @@ class SevenZ:
             "-bse1",
             "-bb3",
         ]
+        if Config.ARCHIVE_THREADS:
+            cmd.append(f"-mmt{Config.ARCHIVE_THREADS}")
+        if not pswd:
+            cmd.remove(f"-p{pswd}")
         if self._listener.is_leech and int(size) > self._listener.split_size:
-            if not pswd:
-                del cmd[4]
             LOGGER.info(f"Zip: orig_path: {dl_path}, zip_path: {up_path}.0*")
         else:
             del cmd[1]
-            if not pswd:
-                del cmd[3]
             LOGGER.info(f"Zip: orig_path: {dl_path}, zip_path: {up_path}")
         if self._listener.is_cancelled:
             return False
-        self._listener.subproc = await create_subprocess_exec(
-            *cmd, stdout=PIPE, stderr=PIPE
-        )
-        await self._sevenz_progress()
-        _, stderr = await self._listener.subproc.communicate()
-        code = self._listener.subproc.returncode
+        code, stderr = await self._run(cmd, dl_path, "Zip")
         if self._listener.is_cancelled:
             return False
         if code == -9:
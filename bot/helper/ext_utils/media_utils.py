@@ -1,13 +1,15 @@
 from PIL import Image
-from aiofiles.os import remove, path as aiopath, makedirs
+from aiofiles.os import remove, path as aiopath, makedirs, stat as aiostat
 from asyncio import (
     create_subprocess_exec,
+    create_task,
     gather,
+    shield,
     wait_for,
-    sleep,
     TimeoutError,
 )
 from asyncio.subprocess import PIPE
+from collections import OrderedDict
 from json import JSONDecodeError, loads as json_loads
 from os import path as ospath
 from re import search as re_search, escape
@@ -15,10 +17,14 @@ from time import time
 from aioshutil import rmtree
 
 from ... import LOGGER, cpu_no, DOWNLOAD_DIR
-from .bot_utils import cmd_exec, sync_to_async
+from .bot_utils import cmd_exec, read_records, sync_to_async
 from .files_utils import get_mime_type, is_archive, is_archive_split
 from .status_utils import time_to_seconds
 
+PROBE_CACHE_SIZE = 1024
+_probe_cache = OrderedDict()
+_probe_tasks = {}
+
 
 async def create_thumb(msg, _id=""):
     if not _id:
@@ -34,7 +40,7 @@ async def create_thumb(msg, _id=""):
     return output
 
 
-async def get_media_info(path):
+async def _run_ffprobe(path):
     try:
         process = await create_subprocess_exec(
             "ffprobe",
@@ -44,6 +50,7 @@ async def get_media_info(path):
             "-print_format",
             "json",
             "-show_format",
+            "-show_streams",
             path,
             stdout=PIPE,
             stderr=PIPE,
@@ -51,30 +58,65 @@ async def get_media_info(path):
         try:
             stdout, stderr = await wait_for(process.communicate(), timeout=60)
         except TimeoutError:
-            LOGGER.error(f"ffprobe timed out while getting media info for {path}")
+            LOGGER.error(f"ffprobe timed out while probing {path}")
             process.kill()
-            return 0, None, None
+            return None
 
         if process.returncode != 0:
-            LOGGER.error(f"ffprobe error while getting media info for {path}: {stderr.decode(errors='ignore').strip()}")
-            return 0, None, None
+            LOGGER.error(f"ffprobe error while probing {path}: {stderr.decode(errors='ignore').strip()}")
+            return None
 
         result = stdout.decode().strip()
         try:
-            fields = json_loads(result).get("format")
+            return json_loads(result)
         except JSONDecodeError:
-            fields = None
-        if fields is None:
-            LOGGER.error(f"get_media_info: {result}")
-            return 0, None, None
-        duration = round(float(fields.get("duration", 0)))
-        tags = fields.get("tags", {})
-        artist = tags.get("artist") or tags.get("ARTIST") or tags.get("Artist")
-        title = tags.get("title") or tags.get("TITLE") or tags.get("Title")
-        return duration, artist, title
+            LOGGER.error(f"probe_media: {result}")
+            return None
     except Exception as e:
-        LOGGER.error(f"Exception in get_media_info for {path}: {e}")
+        LOGGER.error(f"Exception in probe_media for {path}: {e}")
+        return None
+
+
+async def probe_media(path):
+    """ffprobe format and streams of a file, cached by (dev, inode, size, mtime_ns).
+
+    A rename keeps the entry since the content didn't change, while a rewrite
+    changes size or mtime and so misses it. Callers must not modify the result.
+    """
+    try:
+        st = await aiostat(path)
+    except OSError as e:
+        LOGGER.error(f"probe_media: {e}")
+        return None
+    key = (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+    if key in _probe_cache:
+        _probe_cache.move_to_end(key)
+        return _probe_cache[key]
+    if (task := _probe_tasks.get(key)) is None:
+        task = _probe_tasks[key] = create_task(_run_ffprobe(path))
+        task.add_done_callback(lambda _: _probe_tasks.pop(key, None))
+    result = await shield(task)
+    if result is not None:
+        _probe_cache[key] = result
+        while len(_probe_cache) > PROBE_CACHE_SIZE:
+            _probe_cache.popitem(last=False)
+    return result
+
+
+async def get_media_info(path):
+    if (result := await probe_media(path)) is None:
         return 0, None, None
+    if (fields := result.get("format")) is None:
+        LOGGER.error(f"get_media_info: {result}")
+        return 0, None, None
+    try:
+        duration = round(float(fields.get("duration", 0)))
+    except ValueError:
+        duration = 0
+    tags = fields.get("tags", {})
+    artist = tags.get("artist") or tags.get("ARTIST") or tags.get("Artist")
+    title = tags.get("title") or tags.get("TITLE") or tags.get("Title")
+    return duration, artist, title
 
 
 async def get_document_type(path):
@@ -88,50 +130,19 @@ async def get_document_type(path):
     mime_type = await sync_to_async(get_mime_type, path)
     if mime_type.startswith("image"):
         return False, False, True
-    try:
-        process = await create_subprocess_exec(
-            "ffprobe",
-            "-hide_banner",
-            "-loglevel",
-            "error",
-            "-print_format",
-            "json",
-            "-show_streams",
-            path,
-            stdout=PIPE,
-            stderr=PIPE,
-        )
-        try:
-            stdout, stderr = await wait_for(process.communicate(), timeout=60)
-        except TimeoutError:
-            LOGGER.error(f"ffprobe timed out while getting document type for {path}")
-            process.kill()
-            return False, False, False
-
-        if process.returncode != 0:
-            LOGGER.error(f"ffprobe error while getting document type for {path}: {stderr.decode(errors='ignore').strip()}")
-            return False, False, False
-
-        result = stdout.decode().strip()
-        try:
-            fields = json_loads(result).get("streams")
-        except JSONDecodeError:
-            fields = None
-        if fields is None:
-            LOGGER.error(f"get_document_type: {result}")
-            return is_video, is_audio, is_image
-        is_video = False
-        for stream in fields:
-            if stream.get("codec_type") == "video":
-                codec_name = stream.get("codec_name", "").lower()
-                if codec_name not in {"mjpeg", "png", "bmp"}:
-                    is_video = True
-            elif stream.get("codec_type") == "audio":
-                is_audio = True
-        return is_video, is_audio, is_image
-    except Exception as e:
-        LOGGER.error(f"Exception in get_document_type for {path}: {e}")
+    if (result := await probe_media(path)) is None:
         return False, False, False
+    if (fields := result.get("streams")) is None:
+        LOGGER.error(f"get_document_type: {result}")
+        return is_video, is_audio, is_image
+    for stream in fields:
+        if stream.get("codec_type") == "video":
+            codec_name = stream.get("codec_name", "").lower()
+            if codec_name not in {"mjpeg", "png", "bmp"}:
+                is_video = True
+        elif stream.get("codec_type") == "audio":
+            is_audio = True
+    return is_video, is_audio, is_image
 
 
 async def take_ss(video_file, ss_nb) -> bool:
@@ -352,51 +363,40 @@ class FFMpeg:
         self._last_processed_bytes = 0
 
     async def _ffmpeg_progress(self):
-        last_update = time()
-        while not (
-            self._listener.subproc.returncode is not None
-            or self._listener.is_cancelled
-            or self._listener.subproc.stdout.at_eof()
-        ):
-            if time() - last_update > 15:
-                LOGGER.error(f"FFmpeg stuck for {self._listener.name}. Killing process.")
-                self._listener.subproc.kill()
-                # await self._listener.on_download_error("FFmpeg process hanged!")
-                return
-
-            try:
-                line = await wait_for(self._listener.subproc.stdout.readline(), 1)
-            except TimeoutError:
-                continue
-
-            line = line.decode().strip()
-            if line:
-                last_update = time()
-                if "=" in line:
-                    key, value = line.split("=", 1)
-                    if value != "N/A":
-                        if key == "total_size":
-                            self._processed_bytes = int(value) + self._last_processed_bytes
-                            self._speed_raw = self._processed_bytes / (
-                                time() - self._start_time
-                            )
-                        elif key == "speed":
-                            self._time_rate = max(0.1, float(value.strip("x")))
-                        elif key == "out_time":
-                            self._processed_time = (
-                                time_to_seconds(value) + self._last_processed_time
-                            )
-                            try:
-                                self._progress_raw = (
-                                    self._processed_time * 100
-                                ) / self._total_time
-                                self._eta_raw = (
-                                    self._total_time - self._processed_time
-                                ) / self._time_rate
-                            except:
-                                self._progress_raw = 0
-                                self._eta_raw = 0
-            await sleep(0.05)
+        try:
+            async for records in read_records(
+                self._listener.subproc.stdout, timeout=15
+            ):
+                if self._listener.is_cancelled:
+                    break
+                for record in records:
+                    key, _, value = record.decode(errors="ignore").partition("=")
+                    if not value or value == "N/A":
+                        continue
+                    if key == "total_size":
+                        self._processed_bytes = int(value) + self._last_processed_bytes
+                        self._speed_raw = self._processed_bytes / (
+                            time() - self._start_time
+                        )
+                    elif key == "speed":
+                        self._time_rate = max(0.1, float(value.strip("x")))
+                    elif key == "out_time":
+                        self._processed_time = (
+                            time_to_seconds(value) + self._last_processed_time
+                        )
+                        try:
+                            self._progress_raw = (
+                                self._processed_time * 100
+                            ) / self._total_time
+                            self._eta_raw = (
+                                self._total_time - self._processed_time
+                            ) / self._time_rate
+                        except:
+                            self._progress_raw = 0
+                            self._eta_raw = 0
+        except TimeoutError:
+            LOGGER.error(f"FFmpeg stuck for {self._listener.name}. Killing process.")
+            self._listener.subproc.kill()
 
     async def run_command(self, cmd, f_path):
         self.clear()
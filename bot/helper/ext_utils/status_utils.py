@@ -1,13 +1,22 @@
 from html import escape
 from psutil import virtual_memory, cpu_percent, disk_usage
 from time import time
-from asyncio import iscoroutinefunction, gather
+from asyncio import iscoroutinefunction, gather, Lock
 
-from ... import task_dict, task_dict_lock, bot_start_time, status_dict, DOWNLOAD_DIR
+from ... import (
+    LOGGER,
+    task_dict,
+    task_dict_lock,
+    bot_start_time,
+    status_dict,
+    DOWNLOAD_DIR,
+)
 from ...core.config_manager import Config
 from ..telegram_helper.button_build import ButtonMaker
 
 SIZE_UNITS = ["B", "KB", "MB", "GB", "TB", "PB"]
+# keys not asked for in this long are left out of the next refresh
+SNAPSHOT_KEY_TIMEOUT = 60
 
 
 class MirrorStatus:
@@ -47,42 +56,101 @@ STATUSES = {
 
 
 async def get_task_by_gid(gid: str):
-    async with task_dict_lock:
-        for tk in task_dict.values():
-            if hasattr(tk, "seeding"):
-                await tk.update()
-            if tk.gid() == gid:
-                return tk
-        return None
+    if tk := task_dict.gids.get(gid):
+        if hasattr(tk, "seeding"):
+            await tk.update()
+        return tk
+    # aria2/qbit gids can appear or change on update, which reindexes them
+    for tk in [tk for tk in list(task_dict.values()) if hasattr(tk, "seeding")]:
+        await tk.update()
+        if found := task_dict.gids.get(gid):
+            return found
+    return None
+
+
+class StatusSnapshot:
+    def __init__(self, tasks, statuses):
+        self.tasks = list(zip(tasks, statuses))
+        self.footer = (
+            f"<b>CPU:</b> {cpu_percent()}% | <b>FREE:</b> {get_readable_file_size(disk_usage(DOWNLOAD_DIR).free)}"
+            f"\n<b>RAM:</b> {virtual_memory().percent}% | <b>UPTIME:</b> {get_readable_time(time() - bot_start_time)}"
+        )
+        self._texts = {}
+
+    def filter(self, status, user_id):
+        return [
+            (tk, st)
+            for tk, st in self.tasks
+            if (not user_id or tk.listener.user_id == user_id)
+            and (
+                status == "All"
+                or st == status
+                or status == MirrorStatus.STATUS_DOWNLOAD
+                and st not in STATUSES.values()
+            )
+        ]
+
+    def task_text(self, task, tstatus):
+        key = (task, tstatus)
+        if key not in self._texts:
+            self._texts[key] = get_task_text(task, tstatus)
+        return self._texts[key]
+
+
+class EngineSnapshot:
+    """Downloads of one engine fetched with a single bulk call and shared by
+    all its status objects until the snapshot is older than
+    `STATUS_SNAPSHOT_TTL`. `fetch` gets the requested keys and returns a dict
+    of them."""
+
+    def __init__(self, engine, fetch):
+        self._engine = engine
+        self._fetch = fetch
+        self._lock = Lock()
+        self._keys = {}
+        self._fetched = set()
+        self._items = {}
+        self._time = 0
+
+    async def get(self, key):
+        self._keys[key] = time()
+        async with self._lock:
+            if (
+                key not in self._fetched
+                or time() - self._time >= Config.STATUS_SNAPSHOT_TTL
+            ):
+                await self._refresh()
+        return self._items.get(key)
+
+    async def _refresh(self):
+        now = time()
+        self._keys = {
+            key: asked
+            for key, asked in self._keys.items()
+            if now - asked < SNAPSHOT_KEY_TIMEOUT
+        }
+        keys = list(self._keys)
+        try:
+            self._items = await self._fetch(keys)
+        except Exception as e:
+            LOGGER.error(f"{e}: {self._engine}, while refreshing status snapshot")
+        self._fetched = set(keys) | set(self._items)
+        self._time = time()
+
+
+async def get_task_status(tk):
+    return await tk.status() if iscoroutinefunction(tk.status) else tk.status()
+
+
+async def get_status_snapshot():
+    tasks = list(task_dict.values())
+    statuses = await gather(*(get_task_status(tk) for tk in tasks))
+    return StatusSnapshot(tasks, statuses)
 
 
 async def get_specific_tasks(status, user_id):
-    if status == "All":
-        if user_id:
-            return [tk for tk in task_dict.values() if tk.listener.user_id == user_id]
-        else:
-            return list(task_dict.values())
-    tasks_to_check = (
-        [tk for tk in task_dict.values() if tk.listener.user_id == user_id]
-        if user_id
-        else list(task_dict.values())
-    )
-    coro_tasks = []
-    coro_tasks.extend(tk for tk in tasks_to_check if iscoroutinefunction(tk.status))
-    coro_statuses = await gather(*[tk.status() for tk in coro_tasks])
-    result = []
-    coro_index = 0
-    for tk in tasks_to_check:
-        if tk in coro_tasks:
-            st = coro_statuses[coro_index]
-            coro_index += 1
-        else:
-            st = tk.status()
-        if (st == status) or (
-            status == MirrorStatus.STATUS_DOWNLOAD and st not in STATUSES.values()
-        ):
-            result.append(tk)
-    return result
+    snapshot = await get_status_snapshot()
+    return [tk for tk, _ in snapshot.filter(status, user_id)]
 
 
 async def get_all_tasks(req_status: str, user_id):
@@ -156,11 +224,61 @@ def get_progress_bar_string(pct):
     return f"[{p_str}]"
 
 
-async def get_readable_message(sid, is_user, page_no=1, status="All", page_step=1):
+def get_task_text(task, tstatus):
+    msg = f"<code>{escape(f'{task.name()}')}</code>"
+    if task.listener.subname:
+        msg += f"\n<i>{task.listener.subname}</i>"
+    if (
+        tstatus not in [MirrorStatus.STATUS_SEED, MirrorStatus.STATUS_QUEUEUP]
+        and task.listener.progress
+    ):
+        progress = task.progress()
+        msg += f"\n{get_progress_bar_string(progress)} {progress}"
+        if task.listener.subname:
+            subsize = f"/{get_readable_file_size(task.listener.subsize)}"
+            ac = len(task.listener.files_to_proceed)
+            count = f"{task.listener.proceed_count}/{ac or '?'}"
+        else:
+            subsize = ""
+            count = ""
+        msg += f"\n<b>Processed:</b> {task.processed_bytes()}{subsize}"
+        if count:
+            msg += f"\n<b>Count:</b> {count}"
+        if hasattr(task, "stages") and (stages := task.stages()):
+            msg += f"\n<b>Stages:</b> {stages}"
+        msg += f"\n<b>Size:</b> {task.size()}"
+        msg += f"\n<b>Speed:</b> {task.speed()}"
+        msg += f"\n<b>ETA:</b> {task.eta()}"
+        if (
+            tstatus == MirrorStatus.STATUS_DOWNLOAD
+            and task.listener.is_torrent
+            or task.listener.is_qbit
+        ):
+            try:
+                msg += f"\n<b>Seeders:</b> {task.seeders_num()} | <b>Leechers:</b> {task.leechers_num()}"
+            except:
+                pass
+    elif tstatus == MirrorStatus.STATUS_SEED:
+        msg += f"\n<b>Size: </b>{task.size()}"
+        msg += f"\n<b>Speed: </b>{task.seed_speed()}"
+        msg += f"\n<b>Uploaded: </b>{task.uploaded_bytes()}"
+        msg += f"\n<b>Ratio: </b>{task.ratio()}"
+        msg += f" | <b>Time: </b>{task.seeding_time()}"
+    else:
+        msg += f"\n<b>Size: </b>{task.size()}"
+    msg += f"\n<b>Gid: </b><code>{task.gid()}</code>\n\n"
+    return msg
+
+
+async def get_readable_message(
+    sid, is_user, page_no=1, status="All", page_step=1, snapshot=None
+):
     msg = ""
     button = None
 
-    tasks = await get_specific_tasks(status, sid if is_user else None)
+    if snapshot is None:
+        snapshot = await get_status_snapshot()
+    tasks = snapshot.filter(status, sid if is_user else None)
 
     STATUS_LIMIT = Config.STATUS_LIMIT
     tasks_no = len(tasks)
@@ -173,59 +291,16 @@ async def get_readable_message(sid, is_user, page_no=1, status="All", page_step=
         status_dict[sid]["page_no"] = page_no
     start_position = (page_no - 1) * STATUS_LIMIT
 
-    for index, task in enumerate(
+    for index, (task, tstatus) in enumerate(
         tasks[start_position : STATUS_LIMIT + start_position], start=1
     ):
         if status != "All":
             tstatus = status
-        elif iscoroutinefunction(task.status):
-            tstatus = await task.status()
-        else:
-            tstatus = task.status()
         if task.listener.is_super_chat:
             msg += f"<b>{index + start_position}.<a href='{task.listener.message.link}'>{tstatus}</a>: </b>"
         else:
             msg += f"<b>{index + start_position}.{tstatus}: </b>"
-        msg += f"<code>{escape(f'{task.name()}')}</code>"
-        if task.listener.subname:
-            msg += f"\n<i>{task.listener.subname}</i>"
-        if (
-            tstatus not in [MirrorStatus.STATUS_SEED, MirrorStatus.STATUS_QUEUEUP]
-            and task.listener.progress
-        ):
-            progress = task.progress()
-            msg += f"\n{get_progress_bar_string(progress)} {progress}"
-            if task.listener.subname:
-                subsize = f"/{get_readable_file_size(task.listener.subsize)}"
-                ac = len(task.listener.files_to_proceed)
-                count = f"{task.listener.proceed_count}/{ac or '?'}"
-            else:
-                subsize = ""
-                count = ""
-            msg += f"\n<b>Processed:</b> {task.processed_bytes()}{subsize}"
-            if count:
-                msg += f"\n<b>Count:</b> {count}"
-            msg += f"\n<b>Size:</b> {task.size()}"
-            msg += f"\n<b>Speed:</b> {task.speed()}"
-            msg += f"\n<b>ETA:</b> {task.eta()}"
-            if (
-                tstatus == MirrorStatus.STATUS_DOWNLOAD
-                and task.listener.is_torrent
-                or task.listener.is_qbit
-            ):
-                try:
-                    msg += f"\n<b>Seeders:</b> {task.seeders_num()} | <b>Leechers:</b> {task.leechers_num()}"
-                except:
-                    pass
-        elif tstatus == MirrorStatus.STATUS_SEED:
-            msg += f"\n<b>Size: </b>{task.size()}"
-            msg += f"\n<b>Speed: </b>{task.seed_speed()}"
-            msg += f"\n<b>Uploaded: </b>{task.uploaded_bytes()}"
-            msg += f"\n<b>Ratio: </b>{task.ratio()}"
-            msg += f" | <b>Time: </b>{task.seeding_time()}"
-        else:
-            msg += f"\n<b>Size: </b>{task.size()}"
-        msg += f"\n<b>Gid: </b><code>{task.gid()}</code>\n\n"
+        msg += snapshot.task_text(task, tstatus)
 
     if len(msg) == 0:
         if status == "All":
@@ -248,6 +323,5 @@ async def get_readable_message(sid, is_user, page_no=1, status="All", page_step=
                 buttons.data_button(label, f"status {sid} st {status_value}")
     buttons.data_button("♻️", f"status {sid} ref", position="header")
     button = buttons.build_menu(8)
-    msg += f"<b>CPU:</b> {cpu_percent()}% | <b>FREE:</b> {get_readable_file_size(disk_usage(DOWNLOAD_DIR).free)}"
-    msg += f"\n<b>RAM:</b> {virtual_memory().percent}% | <b>UPTIME:</b> {get_readable_time(time() - bot_start_time)}"
+    msg += snapshot.footer
     return msg, button
@@ -1,6 +1,9 @@
 from asyncio import Event
+from collections import Counter
+from shutil import disk_usage
 
 from ... import (
+    DOWNLOAD_DIR,
     queued_dl,
     queued_up,
     non_queued_up,
@@ -11,7 +14,7 @@ from ... import (
 from ...core.config_manager import Config
 from ..mirror_leech_utils.gdrive_utils.search import GoogleDriveSearch
 from .bot_utils import sync_to_async, get_telegraph_list
-from .files_utils import get_base_name
+from .files_utils import get_archive_ext, get_base_name
 from .links_utils import is_gdrive_id
 
 
@@ -29,7 +32,7 @@ async def stop_duplicate_check(listener):
     LOGGER.info(f"Checking File/Folder if already in Drive: {name}")
 
     if listener.compress:
-        name = f"{name}.zip"
+        name = f"{name}.{get_archive_ext()}"
     elif listener.extract:
         try:
             name = get_base_name(name)
@@ -51,28 +54,111 @@ async def stop_duplicate_check(listener):
     return False, None
 
 
-async def check_running_tasks(listener, state="dl"):
+class FifoPolicy:
+    def pick(self, mids, _):
+        return mids[0]
+
+
+class FairPolicy:
+    """Least busy user first, then the smallest known size, then arrival order."""
+
+    def pick(self, mids, running_users):
+        def key(item):
+            index, mid = item
+            info = _task_info.get(mid, {})
+            size = info["listener"].size if info else 0
+            return (running_users[info.get("user_id")], not size, size, index)
+
+        return min(enumerate(mids), key=key)[1]
+
+
+POLICIES = {"fifo": FifoPolicy(), "fair": FairPolicy()}
+_task_info = {}
+
+
+def _engine_has_slot(engine):
+    if not engine or not (limit := Config.QUEUE_ENGINE_LIMITS.get(engine)):
+        return True
+    running = sum(
+        1 for mid in non_queued_dl if _task_info.get(mid, {}).get("engine") == engine
+    )
+    return running < limit
+
+
+def _fits_disk(listener, reserved=0):
+    if not listener.size or not non_queued_dl:
+        return True
+    return disk_usage(DOWNLOAD_DIR).free - reserved >= listener.size
+
+
+def _next_queued(queued, state):
+    policy = POLICIES.get(Config.QUEUE_POLICY, POLICIES["fair"])
+    seen = set()
+    reserved = 0
+    while mids := [mid for mid in queued if mid not in seen]:
+        running_users = Counter(
+            _task_info[mid]["user_id"]
+            for mid in non_queued_dl | non_queued_up
+            if mid in _task_info
+        )
+        mid = policy.pick(mids, running_users)
+        seen.add(mid)
+        if state == "dl" and (info := _task_info.get(mid)):
+            if not _engine_has_slot(info["engine"]) or not _fits_disk(
+                info["listener"], reserved
+            ):
+                continue
+            reserved += info["listener"].size
+        yield mid
+
+
+def _prune_task_info():
+    for mid in list(_task_info):
+        if (
+            mid not in queued_dl
+            and mid not in queued_up
+            and mid not in non_queued_dl
+            and mid not in non_queued_up
+        ):
+            del _task_info[mid]
+
+
+async def check_running_tasks(listener, state="dl", engine=""):
     all_limit = Config.QUEUE_ALL
     state_limit = Config.QUEUE_DOWNLOAD if state == "dl" else Config.QUEUE_UPLOAD
     event = None
     is_over_limit = False
     async with queue_dict_lock:
+        if listener.mid in _task_info:
+            engine = engine or _task_info[listener.mid]["engine"]
+        _task_info[listener.mid] = {
+            "listener": listener,
+            "user_id": listener.user_id,
+            "engine": engine,
+        }
         if state == "up" and listener.mid in non_queued_dl:
             non_queued_dl.remove(listener.mid)
+        if state == "up" and listener.mid in non_queued_up:
+            # the slot was taken while streaming
+            return False, None
         if (
-            (all_limit or state_limit)
-            and not listener.force_run
+            not listener.force_run
             and not (listener.force_upload and state == "up")
             and not (listener.force_download and state == "dl")
         ):
-            dl_count = len(non_queued_dl)
-            up_count = len(non_queued_up)
-            t_count = dl_count if state == "dl" else up_count
-            is_over_limit = (
-                all_limit
-                and dl_count + up_count >= all_limit
-                and (not state_limit or t_count >= state_limit)
-            ) or (state_limit and t_count >= state_limit)
+            if all_limit or state_limit:
+                dl_count = len(non_queued_dl)
+                up_count = len(non_queued_up)
+                t_count = dl_count if state == "dl" else up_count
+                is_over_limit = (
+                    all_limit
+                    and dl_count + up_count >= all_limit
+                    and (not state_limit or t_count >= state_limit)
+                ) or (state_limit and t_count >= state_limit)
+            if not is_over_limit and state == "dl":
+                is_over_limit = not _engine_has_slot(engine) or not _fits_disk(
+                    listener
+                )
             if is_over_limit:
                 event = Event()
                 if state == "dl":
@@ -88,6 +174,26 @@ async def check_running_tasks(listener, state="dl"):
     return is_over_limit, event
 
 
+async def claim_upload_slot(listener):
+    """Counts a task that is still downloading as an upload too, only if the
+    upload limit has room and no queued upload is waiting for it."""
+    async with queue_dict_lock:
+        if listener.mid in non_queued_up:
+            return True
+        if (
+            not listener.force_run
+            and not listener.force_upload
+            and (
+                queued_up
+                or Config.QUEUE_UPLOAD
+                and len(non_queued_up) >= Config.QUEUE_UPLOAD
+            )
+        ):
+            return False
+        non_queued_up.add(listener.mid)
+        return True
+
+
 async def start_dl_from_queued(mid: int):
     queued_dl[mid].set()
     del queued_dl[mid]
@@ -101,6 +207,8 @@ async def start_up_from_queued(mid: int):
 
 
 async def start_from_queued():
+    async with queue_dict_lock:
+        _prune_task_info()
     if all_limit := Config.QUEUE_ALL:
         dl_limit = Config.QUEUE_DOWNLOAD
         up_limit = Config.QUEUE_UPLOAD
@@ -111,13 +219,13 @@ async def start_from_queued():
             if all_ < all_limit:
                 f_tasks = all_limit - all_
                 if queued_up and (not up_limit or up < up_limit):
-                    for index, mid in enumerate(list(queued_up.keys()), start=1):
+                    for index, mid in enumerate(_next_queued(queued_up, "up"), start=1):
                         await start_up_from_queued(mid)
                         f_tasks -= 1
                         if f_tasks == 0 or (up_limit and index >= up_limit - up):
                             break
                 if queued_dl and (not dl_limit or dl < dl_limit) and f_tasks != 0:
-                    for index, mid in enumerate(list(queued_dl.keys()), start=1):
+                    for index, mid in enumerate(_next_queued(queued_dl, "dl"), start=1):
                         await start_dl_from_queued(mid)
                         if (dl_limit and index >= dl_limit - dl) or index == f_tasks:
                             break
@@ -128,27 +236,25 @@ async def start_from_queued():
             up = len(non_queued_up)
             if queued_up and up < up_limit:
                 f_tasks = up_limit - up
-                for index, mid in enumerate(list(queued_up.keys()), start=1):
+                for index, mid in enumerate(_next_queued(queued_up, "up"), start=1):
                     await start_up_from_queued(mid)
                     if index == f_tasks:
                         break
     else:
         async with queue_dict_lock:
-            if queued_up:
-                for mid in list(queued_up.keys()):
-                    await start_up_from_queued(mid)
+            for mid in _next_queued(queued_up, "up"):
+                await start_up_from_queued(mid)
 
     if dl_limit := Config.QUEUE_DOWNLOAD:
         async with queue_dict_lock:
             dl = len(non_queued_dl)
             if queued_dl and dl < dl_limit:
                 f_tasks = dl_limit - dl
-                for index, mid in enumerate(list(queued_dl.keys()), start=1):
+                for index, mid in enumerate(_next_queued(queued_dl, "dl"), start=1):
                     await start_dl_from_queued(mid)
                     if index == f_tasks:
                         break
     else:
         async with queue_dict_lock:
-            if queued_dl:
-                for mid in list(queued_dl.keys()):
-                    await start_dl_from_queued(mid)
+            for mid in _next_queued(queued_dl, "dl"):
+                await start_dl_from_queued(mid)
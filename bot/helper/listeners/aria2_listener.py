@@ -11,6 +11,7 @@ from ..ext_utils.files_utils import clean_unwanted
 from ..ext_utils.status_utils import get_task_by_gid
 from ..ext_utils.task_manager import stop_duplicate_check
 from ..mirror_leech_utils.status_utils.aria2_status import Aria2Status
+from .direct_listener import direct_gids
 from ..telegram_helper.message_utils import (
     send_message,
     delete_message,
@@ -60,6 +61,9 @@ async def _on_download_started(api, data):
 async def _on_download_complete(api, data):
     try:
         gid = data["params"][0]["gid"]
+        if direct := direct_gids.get(gid):
+            await direct.on_download_finished(gid)
+            return
         download = await api.tellStatus(gid)
         options = await api.getOption(gid)
     except (TimeoutError, ClientError, Exception) as e:
@@ -171,6 +175,9 @@ async def _on_download_stopped(_, data):
 
 async def _on_download_error(api, data):
     gid = data["params"][0]["gid"]
+    if direct := direct_gids.get(gid):
+        await direct.on_download_finished(gid)
+        return
     await sleep(1)
     LOGGER.info(f"onDownloadError: {gid}")
     error = "None"
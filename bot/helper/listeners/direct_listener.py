@@ -1,9 +1,31 @@
-from asyncio import sleep, TimeoutError
+from asyncio import Event, Lock, wait_for, TimeoutError
 from aiohttp.client_exceptions import ClientError
+from collections import deque
+from time import time
 
 from ... import LOGGER
+from ...core.config_manager import Config
 from ...core.torrent_manager import TorrentManager, aria2_name
 
+direct_gids = {}
+_active = {"time": 0, "downloads": {}}
+_active_lock = Lock()
+
+
+async def get_active_downloads():
+    async with _active_lock:
+        if time() - _active["time"] >= 1:
+            try:
+                downloads = await TorrentManager.aria2.tellActive(
+                    keys=["gid", "status", "completedLength", "downloadSpeed"]
+                )
+            except (TimeoutError, ClientError, Exception) as e:
+                LOGGER.error(f"Unable to get active aria2 downloads: {e}")
+                downloads = []
+            _active["downloads"] = {d["gid"]: d for d in downloads}
+            _active["time"] = time()
+        return _active["downloads"]
+
 
 class DirectListener:
     def __init__(self, path, listener, a2c_opt):
@@ -12,64 +34,76 @@ class DirectListener:
         self._a2c_opt = a2c_opt
         self._proc_bytes = 0
         self._failed = 0
-        self.download_task = None
+        self._gids = set()
+        self._paused = deque()
+        self._active = {}
+        self._done = Event()
         self.name = self.listener.name
 
     @property
     def processed_bytes(self):
-        if self.download_task:
-            return self._proc_bytes + int(
-                self.download_task.get("completedLength", "0")
-            )
-        return self._proc_bytes
+        return self._proc_bytes + sum(
+            int(d.get("completedLength", "0")) for d in self._active.values()
+        )
 
     @property
     def speed(self):
-        return (
-            int(self.download_task.get("downloadSpeed", "0"))
-            if self.download_task
-            else 0
-        )
+        return sum(int(d.get("downloadSpeed", "0")) for d in self._active.values())
+
+    @property
+    def queued(self):
+        return bool(self._gids) and not self._active
+
+    async def update(self):
+        active = await get_active_downloads()
+        self._active = {gid: active[gid] for gid in self._gids if gid in active}
 
     async def download(self, contents):
         self.is_downloading = True
-        for content in contents:
-            if self.listener.is_cancelled:
-                break
+        limit = Config.DIRECT_PARALLEL_DOWNLOADS or len(contents)
+        calls = []
+        for index, content in enumerate(contents):
+            options = self._a2c_opt.copy()
             if content["path"]:
-                self._a2c_opt["dir"] = f"{self._path}/{content['path']}"
+                options["dir"] = f"{self._path}/{content['path']}"
+            else:
+                options["dir"] = self._path
+            options["out"] = content["filename"]
+            if index >= limit:
+                options["pause"] = "true"
+            calls.append(
+                {
+                    "methodName": "aria2.addUri",
+                    "params": [[content["url"]], options, index],
+                }
+            )
+        try:
+            results = await TorrentManager.aria2.multicall(calls)
+        except (TimeoutError, ClientError, Exception) as e:
+            LOGGER.error(f"Unable to add direct downloads due to: {e}")
+            await self.listener.on_download_error(f"Unable to add downloads: {e}")
+            return
+        for index, (content, res) in enumerate(zip(contents, results)):
+            if isinstance(res, list):
+                gid = res[0]
+                self._gids.add(gid)
+                direct_gids[gid] = self
+                if index >= limit:
+                    self._paused.append(gid)
             else:
-                self._a2c_opt["dir"] = self._path
-            filename = content["filename"]
-            self._a2c_opt["out"] = filename
-            try:
-                gid = await TorrentManager.aria2.addUri(
-                    uris=[content["url"]], options=self._a2c_opt, position=0
-                )
-            except (TimeoutError, ClientError, Exception) as e:
                 self._failed += 1
-                LOGGER.error(f"Unable to download {filename} due to: {e}")
-                continue
-            self.download_task = await TorrentManager.aria2.tellStatus(gid)
-            while True:
-                if self.listener.is_cancelled:
-                    if self.download_task:
-                        await TorrentManager.aria2_remove(self.download_task)
-                    break
-                self.download_task = await TorrentManager.aria2.tellStatus(gid)
-                if error_message := self.download_task.get("errorMessage"):
-                    self._failed += 1
-                    LOGGER.error(
-                        f"Unable to download {aria2_name(self.download_task)} due to: {error_message}"
-                    )
-                    await TorrentManager.aria2_remove(self.download_task)
-                    break
-                elif self.download_task.get("status", "") == "complete":
-                    self._proc_bytes += int(self.download_task.get("totalLength", "0"))
-                    await TorrentManager.aria2_remove(self.download_task)
-                    break
-                await sleep(1)
-            self.download_task = None
+                LOGGER.error(
+                    f"Unable to download {content['filename']} due to: {res.get('faultString', res)}"
+                )
+        if self.listener.is_cancelled:
+            await self._remove_all()
+        while self._gids and not self.listener.is_cancelled:
+            try:
+                await wait_for(self._done.wait(), 10)
+            except TimeoutError:
+                await self._check_missed()
+        for gid in list(self._gids):
+            direct_gids.pop(gid, None)
         if self.listener.is_cancelled:
             return
         if self._failed == len(contents):
@@ -78,9 +112,62 @@ class DirectListener:
         await self.listener.on_download_complete()
         return
 
+    async def _check_missed(self):
+        # in case a notification got lost or came before the gid was registered
+        await self.update()
+        for gid in self._gids - set(self._active) - set(self._paused):
+            try:
+                download = await TorrentManager.aria2.tellStatus(gid)
+            except (TimeoutError, ClientError, Exception):
+                continue
+            if download.get("status", "") in ["complete", "error", "removed"]:
+                await self.on_download_finished(gid, download)
+
+    async def on_download_finished(self, gid, download=None):
+        if gid not in self._gids:
+            return
+        if download is None:
+            download = await TorrentManager.aria2.tellStatus(gid)
+        if download.get("status", "") == "complete":
+            self._proc_bytes += int(download.get("totalLength", "0"))
+        else:
+            self._failed += 1
+            LOGGER.error(
+                f"Unable to download {aria2_name(download)} due to: {download.get('errorMessage', 'Removed')}"
+            )
+        self._gids.discard(gid)
+        self._active.pop(gid, None)
+        direct_gids.pop(gid, None)
+        await TorrentManager.aria2_remove(download)
+        if self._paused and not self.listener.is_cancelled:
+            try:
+                await TorrentManager.aria2.unpause(self._paused.popleft())
+            except (TimeoutError, ClientError, Exception) as e:
+                LOGGER.error(f"Unable to resume direct download: {e}")
+        if not self._gids:
+            self._done.set()
+
+    async def _remove_all(self):
+        gids = list(self._gids)
+        self._gids.clear()
+        self._paused.clear()
+        self._active = {}
+        for gid in gids:
+            direct_gids.pop(gid, None)
+        if gids:
+            try:
+                await TorrentManager.aria2.multicall(
+                    [
+                        {"methodName": "aria2.forceRemove", "params": [gid]}
+                        for gid in gids
+                    ]
+                )
+            except (TimeoutError, ClientError, Exception) as e:
+                LOGGER.error(f"Unable to remove direct downloads: {e}")
+        self._done.set()
+
     async def cancel_task(self):
         self.listener.is_cancelled = True
         LOGGER.info(f"Cancelling Download: {self.listener.name}")
         await self.listener.on_download_error("Download Cancelled by User!")
-        if self.download_task:
-            await TorrentManager.aria2_remove(self.download_task)
+        await self._remove_all()
@@ -1,10 +1,23 @@
 from asyncio import sleep
+from os import path as ospath
+from time import time
 
-from ... import intervals, jd_listener_lock, jd_downloads
+from myjd.exception import MYJDException
+
+from ... import LOGGER, intervals, jd_listener_lock, jd_downloads
 from ..ext_utils.bot_utils import new_task
 from ...core.jdownloader_booter import jdownloader
 from ..ext_utils.status_utils import get_task_by_gid
 
+POLL_INTERVAL = 3
+# full resync while subscribed, in case an event got lost or wasn't understood
+RESYNC_INTERVAL = 30
+LISTEN_TIMEOUT = 25000
+PACKAGE_QUERY = {"finished": True, "saveTo": True, "maxResults": -1}
+
+# uuid: {"finished": bool, "saveTo": str} of every package in the download list
+_packages = {}
+
 
 @new_task
 async def remove_download(gid):
@@ -41,48 +54,165 @@ async def _on_download_complete(gid):
                 del jd_downloads[gid]
 
 
+def _owner(save_to, index):
+    path = save_to.rstrip("/")
+    while path:
+        if path in index:
+            return index[path]
+        parent = ospath.dirname(path)
+        if parent == path:
+            break
+        path = parent
+    return None
+
+
+async def _query_packages(uuids=None):
+    query = PACKAGE_QUERY.copy()
+    if uuids is not None:
+        query["packageUUIDs"] = uuids
+    packages = await jdownloader.device.downloads.query_packages([query])
+    packages = {pack["uuid"]: pack for pack in packages}
+    if uuids is None:
+        _packages.clear()
+    else:
+        for uuid in uuids:
+            if uuid not in packages:
+                _packages.pop(uuid, None)
+    _packages.update(packages)
+
+
+def _uncached_ids():
+    # packages of tasks that started downloading after the last query
+    return {
+        pid
+        for d_dict in jd_downloads.values()
+        if d_dict["status"] == "down"
+        for pid in d_dict["ids"]
+        if pid not in _packages
+    }
+
+
+async def _check_downloads(full):
+    """Completes finished tasks. Package ids are dropped and tasks without
+    packages removed only after a `full` query, since a partial one doesn't
+    see every package."""
+    owned = None
+    for d_gid, d_dict in list(jd_downloads.items()):
+        if d_dict["status"] != "down":
+            continue
+        if not full:
+            if d_dict["ids"] and all(
+                _packages.get(pid, {}).get("finished", False) for pid in d_dict["ids"]
+            ):
+                d_dict["status"] = "done"
+                await _on_download_complete(d_gid)
+            continue
+        d_dict["ids"] = [pid for pid in d_dict["ids"] if pid in _packages]
+        if not d_dict["ids"]:
+            if owned is None:
+                # match packages to tasks by walking up their save paths
+                index = {
+                    dl["path"].rstrip("/"): gid
+                    for gid, dl in jd_downloads.items()
+                    if dl["status"] == "down"
+                }
+                owned = {}
+                for uuid, pack in _packages.items():
+                    if gid := _owner(pack.get("saveTo", ""), index):
+                        owned.setdefault(gid, []).append(uuid)
+            d_dict["ids"] = owned.get(d_gid, [])
+        if not d_dict["ids"]:
+            await remove_download(d_gid)
+        elif all(_packages[pid].get("finished", False) for pid in d_dict["ids"]):
+            d_dict["status"] = "done"
+            await _on_download_complete(d_gid)
+
+
+def _changed_packages(events):
+    """Returns the uuids of the packages touched by the events, or None when
+    an event can't be tied to a package and the whole list must be queried."""
+    uuids = set()
+    for event in events:
+        if event.get("publisher") != "downloads":
+            continue
+        event_id = event.get("eventid", "")
+        data = event.get("eventData")
+        if not isinstance(data, dict):
+            return None
+        if event_id.startswith("PACKAGE_UPDATE"):
+            uuid = data.get("uuid")
+        elif event_id.startswith("LINK_UPDATE"):
+            uuid = data.get("packageUUID")
+        else:
+            return None
+        if uuid is None:
+            return None
+        uuids.add(uuid)
+    return uuids
+
+
+async def _subscribe():
+    try:
+        res = await jdownloader.device.events.subscribe(["downloads\\..*"])
+        subscription_id = res["subscriptionid"]
+        await jdownloader.device.events.change_subscription_timeouts(
+            subscription_id, LISTEN_TIMEOUT, LISTEN_TIMEOUT * 2
+        )
+        return subscription_id
+    except (Exception, MYJDException) as e:
+        LOGGER.warning(f"JDownloader events unavailable, polling instead: {e}")
+        return None
+
+
+async def _unsubscribe(subscription_id):
+    try:
+        await jdownloader.device.events.unsubscribe(subscription_id)
+    except (Exception, MYJDException):
+        pass
+
+
 @new_task
 async def _jd_listener():
+    subscription_id = None
+    next_subscribe = 0
+    next_resync = 0
     while True:
-        await sleep(3)
+        if subscription_id is None and time() >= next_subscribe:
+            subscription_id = await _subscribe()
+            next_subscribe = time() + RESYNC_INTERVAL
+        uuids = None
+        if subscription_id is not None:
+            try:
+                events = await jdownloader.device.events.listen(subscription_id)
+                if time() < next_resync:
+                    uuids = _changed_packages(events or [])
+            except (Exception, MYJDException) as e:
+                LOGGER.warning(f"JDownloader event subscription lost: {e}")
+                subscription_id = None
+        else:
+            await sleep(POLL_INTERVAL)
         async with jd_listener_lock:
             if len(jd_downloads) == 0:
                 intervals["jd"] = ""
                 break
+            if uuids is not None:
+                uuids |= _uncached_ids()
+                if not uuids:
+                    continue
             try:
-                packages = await jdownloader.device.downloads.query_packages(
-                    [{"finished": True, "saveTo": True}]
-                )
-            except:
+                if uuids is None:
+                    await _query_packages()
+                    next_resync = time() + RESYNC_INTERVAL
+                else:
+                    await _query_packages(list(uuids))
+            except (Exception, MYJDException):
                 continue
-
-            all_packages = {pack["uuid"]: pack for pack in packages}
-            for d_gid, d_dict in list(jd_downloads.items()):
-                if d_dict["status"] == "down":
-                    for index, pid in enumerate(d_dict["ids"]):
-                        if pid not in all_packages:
-                            del jd_downloads[d_gid]["ids"][index]
-                    if len(jd_downloads[d_gid]["ids"]) == 0:
-                        path = jd_downloads[d_gid]["path"]
-                        jd_downloads[d_gid]["ids"] = [
-                            uid
-                            for uid, pk in all_packages.items()
-                            if pk["saveTo"].startswith(path)
-                        ]
-                    if len(jd_downloads[d_gid]["ids"]) == 0:
-                        await remove_download(d_gid)
-
-            if completed_packages := [
-                pack["uuid"] for pack in packages if pack.get("finished", False)
-            ]:
-                for d_gid, d_dict in list(jd_downloads.items()):
-                    if d_dict["status"] == "down":
-                        is_finished = all(
-                            did in completed_packages for did in d_dict["ids"]
-                        )
-                        if is_finished:
-                            jd_downloads[d_gid]["status"] = "done"
-                            await _on_download_complete(d_gid)
+            await _check_downloads(uuids is None)
+        if subscription_id is not None:
+            # let a burst of link updates gather into one listen batch
+            await sleep(1)
+    if subscription_id is not None:
+        await _unsubscribe(subscription_id)
 
 
 async def on_download_start():
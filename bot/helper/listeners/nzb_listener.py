@@ -53,16 +53,34 @@ async def _on_download_complete(nzo_id):
         await _remove_job(nzo_id, task.listener.mid)
 
 
+async def _get_jobs(nzo_ids, last_update):
+    history, queue = await gather(
+        sabnzbd_client.get_history(nzo_ids=nzo_ids, last_history_update=last_update),
+        sabnzbd_client.get_downloads(nzo_ids=nzo_ids),
+    )
+    # history is false when nothing changed since last_update
+    return history["history"], queue["queue"]["slots"]
+
+
 @new_task
 async def _nzb_listener():
+    last_update = None
+    tracked = set()
     while not intervals["stopAll"]:
         async with nzb_listener_lock:
             try:
-                jobs = (await sabnzbd_client.get_history())["history"]["slots"]
-                downloads = (await sabnzbd_client.get_downloads())["queue"]["slots"]
                 if len(nzb_jobs) == 0:
                     intervals["nzb"] = ""
                     break
+                if tracked != nzb_jobs.keys():
+                    tracked = set(nzb_jobs)
+                    last_update = None
+                history, downloads = await _get_jobs(list(tracked), last_update)
+                if history:
+                    last_update = history.get("last_history_update")
+                    jobs = history["slots"]
+                else:
+                    jobs = []
                 for job in jobs:
                     nzo_id = job["nzo_id"]
                     if nzo_id not in nzb_jobs:
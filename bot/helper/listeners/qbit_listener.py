@@ -21,6 +21,8 @@ from ..ext_utils.task_manager import stop_duplicate_check
 from ..mirror_leech_utils.status_utils.qbit_status import QbittorrentStatus
 from ..telegram_helper.message_utils import update_status_message
 
+qb_sync = {"rid": 0, "torrents": {}}
+
 
 async def _remove_torrent(hash_, tag):
     await TorrentManager.qbittorrent.torrents.delete([hash_], True)
@@ -108,71 +110,102 @@ async def _on_download_complete(tor):
         await _remove_torrent(ext_hash, tag)
 
 
+def _is_completed(tor):
+    return tor.get("completion_on", -1) not in (-1, 0xFFFFFFFF)
+
+
+async def _sync_torrents():
+    data = await TorrentManager.qbittorrent.sync.maindata(qb_sync["rid"])
+    if data.full_update:
+        qb_sync["torrents"] = {}
+    qb_sync["rid"] = data.rid
+    for ext_hash in data.torrents_removed or []:
+        qb_sync["torrents"].pop(ext_hash, None)
+    changed = set()
+    for ext_hash, diff in (data.torrents or {}).items():
+        tor = qb_sync["torrents"].setdefault(ext_hash, {})
+        if any(
+            key in diff and diff[key] != tor.get(key)
+            for key in ("state", "completion_on")
+        ):
+            changed.add(ext_hash)
+        tor.update(diff)
+    return changed
+
+
 @new_task
 async def _qb_listener():
+    qb_sync["rid"] = 0
     while True:
         async with qb_listener_lock:
             try:
-                torrents = await TorrentManager.qbittorrent.torrents.info()
-                if len(torrents) == 0:
+                changed = await _sync_torrents()
+                if not qb_sync["torrents"]:
                     intervals["qb"] = ""
                     break
-                for tor_info in torrents:
-                    tag = tor_info.tags[0]
+                now = time()
+                events = []
+                reannounce = []
+                recheck = []
+                for ext_hash, tor in qb_sync["torrents"].items():
+                    tag = tor.get("tags", "").split(",", 1)[0].strip()
                     if tag not in qb_torrents:
                         continue
-                    state = tor_info.state
+                    qb_tor = qb_torrents[tag]
+                    state = tor.get("state")
+                    # one-shot events are guarded by their flags and checked on
+                    # every sync, the diff only rate-limits rechecks and errors
+                    fresh = ext_hash in changed or not qb_tor["synced"]
+                    qb_tor["synced"] = True
                     if state == "metaDL":
-                        qb_torrents[tag]["stalled_time"] = time()
+                        qb_tor["stalled_time"] = now
                         if (
                             Config.TORRENT_TIMEOUT
-                            and time() - qb_torrents[tag]["start_time"]
-                            >= Config.TORRENT_TIMEOUT
+                            and now - qb_tor["start_time"] >= Config.TORRENT_TIMEOUT
                         ):
-                            await _on_download_error("Dead Torrent!", tor_info)
-                        else:
-                            await TorrentManager.qbittorrent.torrents.reannounce(
-                                [tor_info.hash]
+                            events.append(
+                                (_on_download_error, ext_hash, "Dead Torrent!")
                             )
+                        else:
+                            reannounce.append(ext_hash)
                     elif state == "downloading":
-                        qb_torrents[tag]["stalled_time"] = time()
-                        if not qb_torrents[tag]["stop_dup_check"]:
-                            qb_torrents[tag]["stop_dup_check"] = True
-                            await _stop_duplicate(tor_info)
+                        qb_tor["stalled_time"] = now
+                        if not qb_tor["stop_dup_check"]:
+                            qb_tor["stop_dup_check"] = True
+                            events.append((_stop_duplicate, ext_hash))
                     elif state == "stalledDL":
                         if (
-                            not qb_torrents[tag]["rechecked"]
-                            and 0.99989999999999999 < tor_info.progress < 1
+                            not qb_tor["rechecked"]
+                            and 0.99989999999999999 < tor.get("progress", 0) < 1
                         ):
-                            msg = f"Force recheck - Name: {tor_info.name} Hash: "
-                            msg += f"{tor_info.hash} Downloaded Bytes: {tor_info.downloaded} "
-                            msg += f"Size: {tor_info.size} Total Size: {tor_info.total_size}"
+                            msg = f"Force recheck - Name: {tor.get('name')} Hash: "
+                            msg += f"{ext_hash} Downloaded Bytes: {tor.get('downloaded')} "
+                            msg += f"Size: {tor.get('size')} Total Size: {tor.get('total_size')}"
                             LOGGER.warning(msg)
-                            await TorrentManager.qbittorrent.torrents.recheck(
-                                [tor_info.hash]
-                            )
-                            qb_torrents[tag]["rechecked"] = True
+                            recheck.append(ext_hash)
+                            qb_tor["rechecked"] = True
                         elif (
                             Config.TORRENT_TIMEOUT
-                            and time() - qb_torrents[tag]["stalled_time"]
-                            >= Config.TORRENT_TIMEOUT
+                            and now - qb_tor["stalled_time"] >= Config.TORRENT_TIMEOUT
                         ):
-                            await _on_download_error("Dead Torrent!", tor_info)
+                            events.append(
+                                (_on_download_error, ext_hash, "Dead Torrent!")
+                            )
                         else:
-                            await TorrentManager.qbittorrent.torrents.reannounce(
-                                [tor_info.hash]
+                            reannounce.append(ext_hash)
+                    elif state == "missingFiles" and fresh:
+                        recheck.append(ext_hash)
+                    elif state == "error" and fresh:
+                        events.append(
+                            (
+                                _on_download_error,
+                                ext_hash,
+                                "No enough space for this torrent on device",
                             )
-                    elif state == "missingFiles":
-                        await TorrentManager.qbittorrent.torrents.recheck(
-                            [tor_info.hash]
-                        )
-                    elif state == "error":
-                        await _on_download_error(
-                            "No enough space for this torrent on device", tor_info
                         )
                     elif (
-                        int(tor_info.completion_on.timestamp()) != -1
-                        and not qb_torrents[tag]["uploaded"]
+                        _is_completed(tor)
+                        and not qb_tor["uploaded"]
                         and state
                         in [
                             "queuedUP",
@@ -181,16 +214,30 @@ async def _qb_listener():
                             "forcedUP",
                         ]
                     ):
-                        qb_torrents[tag]["uploaded"] = True
-                        await _on_download_complete(tor_info)
-                    elif (
-                        state in ["stoppedUP", "stoppedDL"]
-                        and qb_torrents[tag]["seeding"]
-                    ):
-                        qb_torrents[tag]["seeding"] = False
-                        await _on_seed_finish(tor_info)
-                        await sleep(0.5)
+                        qb_tor["uploaded"] = True
+                        events.append((_on_download_complete, ext_hash))
+                    elif state in ["stoppedUP", "stoppedDL"] and qb_tor["seeding"]:
+                        qb_tor["seeding"] = False
+                        events.append((_on_seed_finish, ext_hash))
+                if reannounce:
+                    await TorrentManager.qbittorrent.torrents.reannounce(reannounce)
+                if recheck:
+                    await TorrentManager.qbittorrent.torrents.recheck(recheck)
+                if events:
+                    torrents = await TorrentManager.qbittorrent.torrents.info(
+                        hashes=list({event[1] for event in events})
+                    )
+                    infos = {tor_info.hash: tor_info for tor_info in torrents}
+                    for func, ext_hash, *args in events:
+                        if tor_info := infos.get(ext_hash):
+                            if args:
+                                await func(args[0], tor_info)
+                            else:
+                                await func(tor_info)
+                            if func is _on_seed_finish:
+                                await sleep(0.5)
             except (ClientError, TimeoutError, Exception, AQError) as e:
+                qb_sync["rid"] = 0
                 LOGGER.error(str(e))
         await sleep(3)
 
@@ -204,6 +251,7 @@ async def on_download_start(tag):
             "rechecked": False,
             "uploaded": False,
             "seeding": False,
+            "synced": False,
         }
         if not intervals["qb"]:
             intervals["qb"] = await _qb_listener()
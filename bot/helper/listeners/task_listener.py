@@ -4,7 +4,6 @@ from html import escape
 from requests import utils as rutils
 
 from ... import (
-    intervals,
     task_dict,
     task_dict_lock,
     LOGGER,
@@ -22,6 +21,7 @@ from ..common import TaskConfig
 from ..ext_utils.bot_utils import sync_to_async
 from ..ext_utils.db_handler import database
 from ..ext_utils.files_utils import (
+    DirManifest,
     get_path_size,
     clean_download,
     clean_target,
@@ -40,6 +40,7 @@ from ..mirror_leech_utils.status_utils.gdrive_status import GoogleDriveStatus
 from ..mirror_leech_utils.status_utils.queue_status import QueueStatus
 from ..mirror_leech_utils.status_utils.rclone_status import RcloneStatus
 from ..mirror_leech_utils.status_utils.telegram_status import TelegramStatus
+from ..mirror_leech_utils.stream_leech import StreamLeech, can_stream
 from ..mirror_leech_utils.telegram_uploader import TelegramUploader
 from ..video_utils.processor import process_video
 from ..telegram_helper.button_build import ButtonMaker
@@ -47,6 +48,7 @@ from ..telegram_helper.message_utils import (
     send_message,
     delete_status,
     update_status_message,
+    stop_status_updates,
 )
 
 
@@ -56,10 +58,7 @@ class TaskListener(TaskConfig):
 
     async def clean(self):
         try:
-            if st := intervals["status"]:
-                for intvl in list(st.values()):
-                    intvl.cancel()
-            intervals["status"].clear()
+            stop_status_updates()
             await gather(TorrentManager.aria2.purgeDownloadResult(), delete_status())
         except:
             pass
@@ -90,6 +89,9 @@ class TaskListener(TaskConfig):
             await database.add_incomplete_task(
                 self.message.chat.id, self.message.link, self.tag
             )
+        if can_stream(self):
+            self.streamer = StreamLeech(self)
+            self.streamer.start()
 
     async def on_download_complete(self):
         await sleep(2)
@@ -135,6 +137,9 @@ class TaskListener(TaskConfig):
             gid = download.gid()
         LOGGER.info(f"Download completed: {self.name}")
 
+        if self.streamer:
+            await self.streamer.finish()
+
         if not (self.is_torrent or self.is_qbit):
             self.seed = False
 
@@ -172,6 +177,7 @@ class TaskListener(TaskConfig):
         else:
             up_dir = self.dir
             up_path = dl_path
+        manifest = DirManifest(up_dir)
 
         await remove_excluded_files(self.up_dir or self.dir, self.excluded_extensions)
 
@@ -194,7 +200,7 @@ class TaskListener(TaskConfig):
                 return
             self.is_file = await aiopath.isfile(up_path)
             self.name = up_path.replace(f"{up_dir}/", "").split("/", 1)[0]
-            self.size = await get_path_size(up_dir)
+            self.size = await manifest.refresh()
             self.clear()
             await remove_excluded_files(up_dir, self.excluded_extensions)
 
@@ -207,7 +213,7 @@ class TaskListener(TaskConfig):
                 return
             self.is_file = await aiopath.isfile(up_path)
             self.name = up_path.replace(f"{up_dir}/", "").split("/", 1)[0]
-            self.size = await get_path_size(up_dir)
+            self.size = await manifest.refresh()
             self.clear()
 
         if self.name_sub:
@@ -223,9 +229,14 @@ class TaskListener(TaskConfig):
                 return
             self.is_file = await aiopath.isfile(up_path)
             self.name = up_path.replace(f"{up_dir}/", "").split("/", 1)[0]
-            self.size = await get_path_size(up_dir)
+            self.size = await manifest.refresh()
+
+        # a leech converts and splits each file in the upload pipeline, unless
+        # a later stage needs the whole converted folder first
+        convert = bool(self.convert_audio or self.convert_video)
+        pipelined = self.is_leech and not (self.sample_video or self.compress)
 
-        if self.convert_audio or self.convert_video:
+        if convert and not pipelined:
             up_path = await self.convert_media(
                 up_path,
                 gid,
@@ -234,7 +245,7 @@ class TaskListener(TaskConfig):
                 return
             self.is_file = await aiopath.isfile(up_path)
             self.name = up_path.replace(f"{up_dir}/", "").split("/", 1)[0]
-            self.size = await get_path_size(up_dir)
+            self.size = await manifest.refresh()
             self.clear()
 
         if self.sample_video:
@@ -243,7 +254,7 @@ class TaskListener(TaskConfig):
                 return
             self.is_file = await aiopath.isfile(up_path)
             self.name = up_path.replace(f"{up_dir}/", "").split("/", 1)[0]
-            self.size = await get_path_size(up_dir)
+            self.size = await manifest.refresh()
             self.clear()
 
         if self.compress:
@@ -257,13 +268,7 @@ class TaskListener(TaskConfig):
             self.clear()
 
         self.name = up_path.replace(f"{up_dir}/", "").split("/", 1)[0]
-        self.size = await get_path_size(up_dir)
-
-        if self.is_leech and not self.compress:
-            await self.proceed_split(up_path, gid)
-            if self.is_cancelled:
-                return
-            self.clear()
+        self.size = await manifest.refresh()
 
         self.subproc = None
 
@@ -278,11 +283,15 @@ class TaskListener(TaskConfig):
                 return
             LOGGER.info(f"Start from Queued/Upload: {self.name}")
 
-        self.size = await get_path_size(up_dir)
+        self.size = await manifest.refresh()
 
         if self.is_leech:
             LOGGER.info(f"Leech Name: {self.name}")
-            tg = TelegramUploader(self, up_dir)
+            if self.streamer and self.streamer.uploader:
+                tg = self.streamer.uploader
+                self.size += self.streamer.size
+            else:
+                tg = TelegramUploader(self, up_dir, convert and pipelined)
             async with task_dict_lock:
                 task_dict[self.mid] = TelegramStatus(self, tg, gid, "up")
             await gather(
@@ -389,6 +398,8 @@ class TaskListener(TaskConfig):
             await start_from_queued()
             return
         await clean_download(self.dir)
+        if self.streamer:
+            await self.streamer.clean()
         async with task_dict_lock:
             if self.mid in task_dict:
                 del task_dict[self.mid]
@@ -441,6 +452,8 @@ class TaskListener(TaskConfig):
         await clean_download(self.dir)
         if self.up_dir:
             await clean_download(self.up_dir)
+        if self.streamer:
+            await self.streamer.clean()
         if self.thumb and await aiopath.exists(self.thumb):
             await remove(self.thumb)
 
@@ -479,5 +492,7 @@ class TaskListener(TaskConfig):
         await clean_download(self.dir)
         if self.up_dir:
             await clean_download(self.up_dir)
+        if self.streamer:
+            await self.streamer.clean()
         if self.thumb and await aiopath.exists(self.thumb):
             await remove(self.thumb)
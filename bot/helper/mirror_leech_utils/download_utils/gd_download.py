@@ -27,7 +27,7 @@ async def add_gd_download(listener, path):
         await listener.on_download_error(msg, button)
         return
 
-    add_to_queue, event = await check_running_tasks(listener)
+    add_to_queue, event = await check_running_tasks(listener, engine="gdrive")
     if add_to_queue:
         LOGGER.info(f"Added to Queue/Download: {listener.name}")
         async with task_dict_lock:
@@ -275,7 +275,7 @@ async def add_jd_download(listener, path):
                 async with jd_listener_lock:
                     jd_downloads[gid]["ids"] = online_packages
 
-        add_to_queue, event = await check_running_tasks(listener)
+        add_to_queue, event = await check_running_tasks(listener, engine="jd")
         if add_to_queue:
             LOGGER.info(f"Added to Queue/Download: {listener.name}")
             async with task_dict_lock:
@@ -78,7 +78,7 @@ async def add_nzb(listener, path):
         if await aiopath.exists(listener.link):
             url = None
             nzbpath = listener.link
-        add_to_queue, event = await check_running_tasks(listener)
+        add_to_queue, event = await check_running_tasks(listener, engine="nzb")
         res = await sabnzbd_client.add_uri(
             url,
             nzbpath,
@@ -17,6 +17,7 @@ from ...ext_utils.bot_utils import bt_selection_buttons
 from ...ext_utils.task_manager import check_running_tasks
 from ...listeners.qbit_listener import on_download_start
 from ...mirror_leech_utils.status_utils.qbit_status import QbittorrentStatus
+from ...mirror_leech_utils.stream_leech import can_stream
 from ...telegram_helper.message_utils import (
     send_message,
     delete_message,
@@ -52,7 +53,10 @@ async def add_qb_torrent(listener, path, ratio, seed_time):
         else:
             form = form.include_url(listener.link)
         form = form.savepath(path).tags([f"{listener.mid}"])
-        add_to_queue, event = await check_running_tasks(listener)
+        if can_stream(listener):
+            # files complete in upload order
+            form = form.sequential_download(True)
+        add_to_queue, event = await check_running_tasks(listener, engine="qbit")
         if add_to_queue:
             form = form.stopped(add_to_queue)
         if ratio:
@@ -316,7 +316,9 @@ class YoutubeDLHelper:
             await self._listener.on_download_error(msg, button)
             return
 
-        add_to_queue, event = await check_running_tasks(self._listener)
+        add_to_queue, event = await check_running_tasks(
+            self._listener, engine="yt-dlp"
+        )
         if add_to_queue:
             LOGGER.info(f"Added to Queue/Download: {self._listener.name}")
             async with task_dict_lock:
@@ -1,6 +1,11 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from googleapiclient.errors import HttpError
+from json import loads
 from logging import getLogger
 from os import path as ospath
+from queue import Empty, Queue
+from threading import Lock
 from tenacity import (
     retry,
     wait_exponential,
@@ -8,12 +13,14 @@ from tenacity import (
     retry_if_exception_type,
     RetryError,
 )
-from time import time
+from time import sleep, time
 
 from ...ext_utils.bot_utils import async_to_sync
 from ...mirror_leech_utils.gdrive_utils.helper import GoogleDriveHelper
 
 LOGGER = getLogger(__name__)
+CLONE_WORKERS = 4
+BATCH_SIZE = 50
 
 
 class GoogleDriveClone(GoogleDriveHelper):
@@ -22,6 +29,8 @@ class GoogleDriveClone(GoogleDriveHelper):
         self._start_time = time()
         super().__init__()
         self.is_cloning = True
+        self._lock = Lock()
+        self._error = None
         self.user_setting()
 
     def user_setting(self):
@@ -103,28 +112,142 @@ class GoogleDriveClone(GoogleDriveHelper):
             return None, None, None, None, None
 
     def _clone_folder(self, folder_name, folder_id, dest_id):
-        LOGGER.info(f"Syncing: {folder_name}")
-        files = self.get_files_by_folder_id(folder_id)
-        if len(files) == 0:
-            return dest_id
-        for file in files:
-            if file.get("mimeType") == self.G_DRIVE_DIR_MIME_TYPE:
-                self.total_folders += 1
-                file_path = ospath.join(folder_name, file.get("name"))
-                current_dir_id = self.create_directory(file.get("name"), dest_id)
-                self._clone_folder(file_path, file.get("id"), current_dir_id)
-            elif (
-                not file.get("name")
-                .strip()
-                .lower()
-                .endswith(tuple(self.listener.excluded_extensions))
-            ):
-                self.total_files += 1
-                self._copy_file(file.get("id"), dest_id)
-                self.proc_bytes += int(file.get("size", 0))
-                self.total_time = int(time() - self._start_time)
-            if self.listener.is_cancelled:
-                break
+        jobs = Queue()
+        with ThreadPoolExecutor(max_workers=CLONE_WORKERS) as executor:
+            workers = [
+                executor.submit(self._copy_worker, jobs) for _ in range(CLONE_WORKERS)
+            ]
+            try:
+                folders = deque([(folder_name, folder_id, dest_id)])
+                while folders and not self.listener.is_cancelled and not self._error:
+                    path, src_id, dst_id = folders.popleft()
+                    LOGGER.info(f"Syncing: {path}")
+                    for file in self.get_files_by_folder_id(src_id):
+                        if file.get("mimeType") == self.G_DRIVE_DIR_MIME_TYPE:
+                            self.total_folders += 1
+                            folders.append(
+                                (
+                                    ospath.join(path, file.get("name")),
+                                    file.get("id"),
+                                    self.create_directory(file.get("name"), dst_id),
+                                )
+                            )
+                        elif (
+                            not file.get("name")
+                            .strip()
+                            .lower()
+                            .endswith(tuple(self.listener.excluded_extensions))
+                        ):
+                            jobs.put((file.get("id"), dst_id, int(file.get("size", 0))))
+            finally:
+                for _ in workers:
+                    jobs.put(None)
+            for worker in workers:
+                worker.result()
+        if self._error:
+            raise self._error
+
+    def _new_worker(self):
+        worker = GoogleDriveHelper()
+        worker.token_path = self.token_path
+        worker.use_sa = self.use_sa
+        worker.service = worker.authorize()
+        return worker
+
+    def _copy_worker(self, jobs):
+        worker = None
+        batch = []
+        done = False
+        while not done:
+            job = jobs.get()
+            if job is None:
+                done = True
+            else:
+                batch.append(job)
+                while len(batch) < BATCH_SIZE:
+                    try:
+                        job = jobs.get_nowait()
+                    except Empty:
+                        break
+                    if job is None:
+                        done = True
+                        break
+                    batch.append(job)
+            if not batch or self.listener.is_cancelled or self._error:
+                batch = []
+                continue
+            try:
+                if worker is None:
+                    worker = self._new_worker()
+                self._copy_batch(worker, batch)
+            except Exception as e:
+                with self._lock:
+                    self._error = self._error or e
+            batch = []
+
+    def _copy_batch(self, worker, batch):
+        attempts = 0
+        while batch:
+            retry_jobs = []
+            transient_jobs = []
+            errors = []
+
+            def callback(request_id, _, exception):
+                job = batch[int(request_id)]
+                if exception is None:
+                    with self._lock:
+                        self.total_files += 1
+                        self.proc_bytes += job[2]
+                        self.total_time = int(time() - self._start_time)
+                    return
+                reason = ""
+                if isinstance(exception, HttpError) and exception.resp.get(
+                    "content-type", ""
+                ).startswith("application/json"):
+                    reason = (
+                        loads(exception.content)
+                        .get("error", {})
+                        .get("errors", [{}])[0]
+                        .get("reason", "")
+                    )
+                if reason == "cannotCopyFile":
+                    LOGGER.error(exception)
+                elif reason in ["userRateLimitExceeded", "dailyLimitExceeded"]:
+                    retry_jobs.append(job)
+                elif reason in ["rateLimitExceeded", "backendError", "internalError"]:
+                    transient_jobs.append(job)
+                else:
+                    errors.append(exception)
+
+            request = worker.service.new_batch_http_request(callback=callback)
+            for index, (file_id, dest_id, _) in enumerate(batch):
+                request.add(
+                    worker.service.files().copy(
+                        fileId=file_id,
+                        body={"parents": [dest_id]},
+                        supportsAllDrives=True,
+                        fields="id",
+                    ),
+                    request_id=str(index),
+                )
+            request.execute()
+            if errors:
+                raise errors[0]
+            if transient_jobs:
+                attempts += 1
+                if attempts > 3:
+                    raise Exception("Drive kept failing to copy, try again later.")
+                sleep(2**attempts)
+            if retry_jobs:
+                if not worker.use_sa or worker.sa_count >= worker.sa_number:
+                    LOGGER.info(
+                        f"Reached maximum number of service accounts switching, which is {worker.sa_count}"
+                    )
+                    raise Exception("User rate limit exceeded.")
+                if self.listener.is_cancelled:
+                    return
+                worker.switch_service_account()
+            batch = retry_jobs + transient_jobs
 
     @retry(
         wait=wait_exponential(multiplier=2, min=3, max=6),
@@ -1,8 +1,21 @@
+from concurrent.futures import ThreadPoolExecutor
 from googleapiclient.errors import HttpError
-from googleapiclient.http import MediaIoBaseDownload
+from googleapiclient.http import MediaIoBaseDownload, MediaDownloadProgress
 from io import FileIO
 from logging import getLogger
-from os import makedirs, path as ospath
+from os import (
+    makedirs,
+    path as ospath,
+    open as osopen,
+    close,
+    ftruncate,
+    posix_fallocate,
+    pwrite,
+    O_CREAT,
+    O_WRONLY,
+)
+from queue import Empty, Queue
+from threading import Lock
 from tenacity import (
     retry,
     wait_exponential,
@@ -17,12 +30,19 @@ from ...mirror_leech_utils.gdrive_utils.helper import GoogleDriveHelper
 
 LOGGER = getLogger(__name__)
 
+DOWNLOAD_WORKERS = 4
+SEGMENT_WORKERS = 4
+SEGMENT_SIZE = 32 * 1024 * 1024
+
 
 class GoogleDriveDownload(GoogleDriveHelper):
     def __init__(self, listener, path):
         self.listener = listener
         self._updater = None
         self._path = path
+        self._error = None
+        self._lock = Lock()
+        self._received = 0
         super().__init__()
         self.is_downloading = True
 
@@ -33,7 +53,14 @@ class GoogleDriveDownload(GoogleDriveHelper):
         try:
             meta = self.get_file_metadata(file_id)
             if meta.get("mimeType") == self.G_DRIVE_DIR_MIME_TYPE:
-                self._download_folder(file_id, self._path, self.listener.name)
+                files = []
+                self._download_folder(file_id, self._path, self.listener.name, files)
+                self._run_workers("_download_file", files, DOWNLOAD_WORKERS)
+            elif int(meta.get("size", 0)) > 2 * SEGMENT_SIZE:
+                makedirs(self._path, exist_ok=True)
+                self._download_segmented(
+                    file_id, self._path, self.listener.name, int(meta["size"])
+                )
             else:
                 makedirs(self._path, exist_ok=True)
                 self._download_file(
@@ -52,6 +79,8 @@ class GoogleDriveDownload(GoogleDriveHelper):
                     self.use_sa = False
                     LOGGER.error("File not found. Trying with token.pickle...")
                     self._updater.cancel()
+                    self._error = None
+                    self.workers = []
                     return self.download()
                 err = "File not found!"
             async_to_sync(self.listener.on_download_error, err)
@@ -63,7 +92,7 @@ class GoogleDriveDownload(GoogleDriveHelper):
             async_to_sync(self.listener.on_download_complete)
             return
 
-    def _download_folder(self, folder_id, path, folder_name):
+    def _download_folder(self, folder_id, path, folder_name, files):
         folder_name = folder_name.replace("/", "")
         if not ospath.exists(f"{path}/{folder_name}"):
             makedirs(f"{path}/{folder_name}")
@@ -82,16 +111,111 @@ class GoogleDriveDownload(GoogleDriveHelper):
             else:
                 mime_type = item.get("mimeType")
             if mime_type == self.G_DRIVE_DIR_MIME_TYPE:
-                self._download_folder(file_id, path, filename)
+                self._download_folder(file_id, path, filename, files)
             elif not ospath.isfile(
                 f"{path}{filename}"
             ) and not filename.strip().lower().endswith(
                 tuple(self.listener.excluded_extensions)
             ):
-                self._download_file(file_id, path, filename, mime_type)
+                files.append((file_id, path, filename, mime_type))
             if self.listener.is_cancelled:
                 break
 
+    def _new_worker(self):
+        worker = GoogleDriveDownload(self.listener, self._path)
+        worker.token_path = self.token_path
+        worker.use_sa = self.use_sa
+        worker.service = worker.authorize()
+        self.workers.append(worker)
+        return worker
+
+    def _run_workers(self, method, jobs, workers):
+        if not jobs:
+            return
+        queue = Queue()
+        for job in jobs:
+            queue.put(job)
+        workers = min(workers, len(jobs))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for _ in range(workers):
+                executor.submit(self._worker, method, queue)
+        if self._error:
+            raise self._error
+
+    def _worker(self, method, queue):
+        try:
+            worker = self._new_worker()
+            while not self.listener.is_cancelled and not self._error:
+                try:
+                    job = queue.get_nowait()
+                except Empty:
+                    break
+                getattr(worker, method)(*job)
+        except Exception as e:
+            with self._lock:
+                self._error = self._error or e
+
+    def _download_segmented(self, file_id, path, filename, size):
+        filename = self._get_filename(filename)
+        fd = osopen(f"{path}/{filename}", O_WRONLY | O_CREAT, 0o644)
+        try:
+            try:
+                posix_fallocate(fd, 0, size)
+            except OSError:
+                ftruncate(fd, size)
+            segments = [
+                (file_id, fd, start, min(start + SEGMENT_SIZE, size) - 1, size)
+                for start in range(0, size, SEGMENT_SIZE)
+            ]
+            self._run_workers("_download_range", segments, SEGMENT_WORKERS)
+        finally:
+            close(fd)
+
+    @retry(
+        wait=wait_exponential(multiplier=2, min=3, max=6),
+        stop=stop_after_attempt(3),
+        retry=retry_if_exception_type(Exception),
+    )
+    def _download_range(self, file_id, fd, start, end, size):
+        retries = 0
+        while not self.listener.is_cancelled:
+            request = self.service.files().get_media(
+                fileId=file_id, supportsAllDrives=True, acknowledgeAbuse=True
+            )
+            resp, content = request.http.request(
+                request.uri, headers={"range": f"bytes={start}-{end}"}
+            )
+            if resp.status == 206 and len(content) == end - start + 1:
+                pwrite(fd, content, start)
+                self._received += len(content)
+                self.status = MediaDownloadProgress(self._received, size)
+                return
+            err = HttpError(resp, content, uri=request.uri)
+            LOGGER.error(err)
+            if resp.status in [500, 502, 503, 504, 429] and retries < 10:
+                retries += 1
+                continue
+            if resp.get("content-type", "").startswith("application/json"):
+                reason = eval(content).get("error").get("errors")[0].get("reason")
+                if (
+                    reason in ["downloadQuotaExceeded", "dailyLimitExceeded"]
+                    and self.use_sa
+                    and self.sa_count < self.sa_number
+                ):
+                    self.switch_service_account()
+                    LOGGER.info(f"Got: {reason}, Trying Again...")
+                    continue
+            raise err
+
+    def _get_filename(self, filename):
+        filename = filename.replace("/", "")
+        if len(filename.encode()) > 255:
+            ext = ospath.splitext(filename)[1]
+            filename = f"{filename[:245]}{ext}"
+            if self.listener.name.strip().endswith(ext):
+                self.listener.name = filename
+        return filename
+
     @retry(
         wait=wait_exponential(multiplier=2, min=3, max=6),
         stop=stop_after_attempt(3),
@@ -106,15 +230,9 @@ class GoogleDriveDownload(GoogleDriveHelper):
             request = self.service.files().get_media(
                 fileId=file_id, supportsAllDrives=True, acknowledgeAbuse=True
             )
-        filename = filename.replace("/", "")
         if export:
             filename = f"{filename}.pdf"
-        if len(filename.encode()) > 255:
-            ext = ospath.splitext(filename)[1]
-            filename = f"{filename[:245]}{ext}"
-
-            if self.listener.name.strip().endswith(ext):
-                self.listener.name = filename
+        filename = self._get_filename(filename)
         if self.listener.is_cancelled:
             return
         fh = FileIO(f"{path}/{filename}", "wb")
@@ -162,4 +280,5 @@ class GoogleDriveDownload(GoogleDriveHelper):
                     else:
                         LOGGER.error(f"Got: {reason}")
                         raise err
+        self.status = None
         self.file_processed_bytes = 0
@@ -0,0 +1,250 @@
+from asyncio import Lock
+from logging import getLogger
+from os import path as ospath
+from sqlite3 import connect
+from time import time
+
+from .... import drives_ids, bot_loop
+from ....core.config_manager import Config
+from ...ext_utils.bot_utils import SetInterval, sync_to_async
+from .helper import GoogleDriveHelper
+
+LOGGER = getLogger(__name__)
+
+INDEX_PATH = "drive_index.db"
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    drive_id TEXT NOT NULL,
+    id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    mime_type TEXT,
+    size INTEGER,
+    PRIMARY KEY (drive_id, id)
+);
+CREATE INDEX IF NOT EXISTS files_name ON files (drive_id, name);
+CREATE TABLE IF NOT EXISTS drives (
+    drive_id TEXT PRIMARY KEY,
+    page_token TEXT NOT NULL,
+    updated REAL NOT NULL
+);
+"""
+FILE_FIELDS = "id, name, mimeType, size, trashed, ownedByMe"
+CHANGE_FIELDS = f"changes(fileId, removed, file({FILE_FIELDS}))"
+FOLDER_MIME_TYPE = "application/vnd.google-apps.folder"
+
+DriveIndexer = []
+_refresh_lock = Lock()
+
+
+def _connect():
+    conn = connect(INDEX_PATH, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def _is_indexable(drive_id):
+    # shared drives and root, folder ids are listed by parent instead
+    return drive_id == "root" or len(drive_id) <= 23
+
+
+def _save_file(conn, drive_id, file):
+    conn.execute(
+        "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?)",
+        (
+            drive_id,
+            file["id"],
+            file["name"],
+            file.get("mimeType"),
+            int(file["size"]) if "size" in file else None,
+        ),
+    )
+
+
+class DriveIndex(GoogleDriveHelper):
+    def refresh(self):
+        # search switches to token.pickle for tp: targets and multiple drives,
+        # and "root" is the My Drive of whichever account authorizes
+        if ospath.exists(self.token_path):
+            self.use_sa = False
+        self.service = self.authorize()
+        drives = [
+            d
+            for d in dict.fromkeys(drives_ids)
+            if _is_indexable(d) and not (d == "root" and self.use_sa)
+        ]
+        conn = _connect()
+        try:
+            for drive_id in drives:
+                try:
+                    self._refresh_drive(conn, drive_id)
+                except Exception as e:
+                    conn.rollback()
+                    LOGGER.error(f"Unable to refresh drive index of {drive_id}: {e}")
+            marks = ", ".join("?" * len(drives))
+            conn.execute(f"DELETE FROM files WHERE drive_id NOT IN ({marks})", drives)
+            conn.execute(f"DELETE FROM drives WHERE drive_id NOT IN ({marks})", drives)
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _refresh_drive(self, conn, drive_id):
+        row = conn.execute(
+            "SELECT page_token FROM drives WHERE drive_id = ?", (drive_id,)
+        ).fetchone()
+        if row is None:
+            # take the token first so changes made while seeding aren't missed
+            token = self._start_page_token(drive_id)
+            self._seed(conn, drive_id)
+        else:
+            token = self._apply_changes(conn, drive_id, row[0])
+        conn.execute(
+            "INSERT OR REPLACE INTO drives VALUES (?, ?, ?)", (drive_id, token, time())
+        )
+        conn.commit()
+
+    def _start_page_token(self, drive_id):
+        if drive_id == "root":
+            request = self.service.changes().getStartPageToken()
+        else:
+            request = self.service.changes().getStartPageToken(
+                driveId=drive_id, supportsAllDrives=True
+            )
+        return request.execute()["startPageToken"]
+
+    def _seed(self, conn, drive_id):
+        LOGGER.info(f"Building drive index of {drive_id}")
+        if drive_id == "root":
+            kwargs = {"q": "trashed = false and 'me' in owners"}
+        else:
+            kwargs = {
+                "q": "trashed = false",
+                "corpora": "drive",
+                "driveId": drive_id,
+                "supportsAllDrives": True,
+                "includeItemsFromAllDrives": True,
+            }
+        conn.execute("DELETE FROM files WHERE drive_id = ?", (drive_id,))
+        page_token = None
+        while True:
+            response = (
+                self.service.files()
+                .list(
+                    spaces="drive",
+                    pageSize=1000,
+                    fields=f"nextPageToken, files({FILE_FIELDS})",
+                    pageToken=page_token,
+                    **kwargs,
+                )
+                .execute()
+            )
+            for file in response.get("files", []):
+                _save_file(conn, drive_id, file)
+            page_token = response.get("nextPageToken")
+            if page_token is None:
+                break
+
+    def _apply_changes(self, conn, drive_id, page_token):
+        kwargs = (
+            {}
+            if drive_id == "root"
+            else {
+                "driveId": drive_id,
+                "supportsAllDrives": True,
+                "includeItemsFromAllDrives": True,
+            }
+        )
+        while True:
+            response = (
+                self.service.changes()
+                .list(
+                    pageToken=page_token,
+                    spaces="drive",
+                    pageSize=1000,
+                    fields=f"nextPageToken, newStartPageToken, {CHANGE_FIELDS}",
+                    **kwargs,
+                )
+                .execute()
+            )
+            for change in response.get("changes", []):
+                if not (file_id := change.get("fileId")):
+                    continue
+                file = change.get("file")
+                if (
+                    change.get("removed")
+                    or file is None
+                    or file.get("trashed")
+                    or (drive_id == "root" and not file.get("ownedByMe"))
+                ):
+                    conn.execute(
+                        "DELETE FROM files WHERE drive_id = ? AND id = ?",
+                        (drive_id, file_id),
+                    )
+                else:
+                    _save_file(conn, drive_id, file)
+            if "newStartPageToken" in response:
+                return response["newStartPageToken"]
+            page_token = response["nextPageToken"]
+
+
+def search_index(drive_id, file_name, stop_dup=False, item_type=""):
+    """Returns a `files().list` like response, or None when the drive isn't
+    indexed or its index is older than three refresh intervals. "root" is
+    only indexed from token.pickle, so it must not answer service accounts."""
+    if not Config.DRIVE_INDEX_INTERVAL or not _is_indexable(drive_id):
+        return None
+    conn = _connect()
+    try:
+        row = conn.execute(
+            "SELECT updated FROM drives WHERE drive_id = ?", (drive_id,)
+        ).fetchone()
+        if row is None or time() - row[0] > 3 * Config.DRIVE_INDEX_INTERVAL:
+            return None
+        query = "SELECT id, name, mime_type, size FROM files WHERE drive_id = ?"
+        params = [drive_id]
+        if stop_dup:
+            query += " AND name = ?"
+            params.append(file_name)
+        else:
+            for name in file_name.split():
+                for char in "\\%_":
+                    name = name.replace(char, f"\\{char}")
+                query += " AND name LIKE ? ESCAPE '\\'"
+                params.append(f"%{name}%")
+            if item_type == "files":
+                query += " AND mime_type != ?"
+                params.append(FOLDER_MIME_TYPE)
+            elif item_type == "folders":
+                query += " AND mime_type = ?"
+                params.append(FOLDER_MIME_TYPE)
+        query += " ORDER BY mime_type != ?, name COLLATE NOCASE LIMIT ?"
+        params += [FOLDER_MIME_TYPE, 200 if drive_id == "root" else 150]
+        files = []
+        for id_, name, mime_type, size in conn.execute(query, params):
+            file = {"id": id_, "name": name, "mimeType": mime_type}
+            if size is not None:
+                file["size"] = str(size)
+            files.append(file)
+        return {"files": files}
+    finally:
+        conn.close()
+
+
+async def refresh_drive_index():
+    if _refresh_lock.locked():
+        return
+    async with _refresh_lock:
+        try:
+            await sync_to_async(DriveIndex().refresh)
+        except Exception as e:
+            LOGGER.error(f"Unable to refresh drive index: {e}")
+
+
+async def drive_index_booter():
+    if DriveIndexer:
+        DriveIndexer[0].cancel()
+        DriveIndexer.clear()
+    if not Config.DRIVE_INDEX_INTERVAL or not drives_ids:
+        return
+    DriveIndexer.append(SetInterval(Config.DRIVE_INDEX_INTERVAL, refresh_drive_index))
+    bot_loop.create_task(refresh_drive_index())
@@ -45,6 +45,7 @@ class GoogleDriveHelper:
         self.proc_bytes = 0
         self.total_time = 0
         self.status = None
+        self.workers = []
         self.update_interval = 3
         self.use_sa = Config.USE_SERVICE_ACCOUNTS
 
@@ -60,13 +61,14 @@ class GoogleDriveHelper:
         return self.proc_bytes
 
     async def progress(self):
-        if self.status is not None:
-            chunk_size = (
-                self.status.total_size * self.status.progress()
-                - self.file_processed_bytes
-            )
-            self.file_processed_bytes = self.status.total_size * self.status.progress()
-            self.proc_bytes += chunk_size
+        active = False
+        for obj in [self, *self.workers]:
+            if (status := obj.status) is not None:
+                processed = status.total_size * status.progress()
+                self.proc_bytes += processed - obj.file_processed_bytes
+                obj.file_processed_bytes = processed
+                active = True
+        if active:
             self.total_time += self.update_interval
 
     def authorize(self):
@@ -2,6 +2,7 @@ from logging import getLogger
 
 from .... import drives_names, drives_ids, index_urls, user_data
 from ....helper.ext_utils.status_utils import get_readable_file_size
+from ....helper.mirror_leech_utils.gdrive_utils.drive_index import search_index
 from ....helper.mirror_leech_utils.gdrive_utils.helper import GoogleDriveHelper
 
 LOGGER = getLogger(__name__)
@@ -95,6 +96,7 @@ class GoogleDriveSearch(GoogleDriveHelper):
 
     def drive_list(self, file_name, target_id="", user_id=""):
         msg = ""
+        key = str(file_name).strip()
         file_name = self.escapes(str(file_name))
         contents_no = 0
         telegraph_content = []
@@ -119,13 +121,21 @@ class GoogleDriveSearch(GoogleDriveHelper):
         ):
             self.use_sa = False
 
-        self.service = self.authorize()
-
         for drive_name, dir_id, index_url in drives:
             isRecur = (
                 False if self._is_recursive and len(dir_id) > 23 else self._is_recursive
             )
-            response = self._drive_query(dir_id, file_name, isRecur)
+            response = None
+            if (
+                isRecur
+                and not target_id.startswith("mtp:")
+                and not (dir_id == "root" and self.use_sa)
+            ):
+                response = search_index(dir_id, key, self._stop_dup, self._item_type)
+            if response is None:
+                if self.service is None:
+                    self.service = self.authorize()
+                response = self._drive_query(dir_id, file_name, isRecur)
             if not response["files"]:
                 if self._no_multi:
                     break
@@ -1,7 +1,10 @@
+from concurrent.futures import ThreadPoolExecutor
 from googleapiclient.errors import HttpError
 from googleapiclient.http import MediaFileUpload
 from logging import getLogger
 from os import path as ospath, listdir, remove
+from queue import Empty, Queue
+from threading import Lock
 from tenacity import (
     retry,
     wait_exponential,
@@ -18,12 +21,26 @@ from ...mirror_leech_utils.gdrive_utils.helper import GoogleDriveHelper
 LOGGER = getLogger(__name__)
 
 
+def get_chunk_size(size):
+    # one request for small files, and smaller chunks for medium ones so
+    # parallel sessions don't each buffer 100MB
+    if size <= 8 * 1024 * 1024:
+        return -1
+    if size <= 512 * 1024 * 1024:
+        return 16 * 1024 * 1024
+    if size <= 2 * 1024 * 1024 * 1024:
+        return 50 * 1024 * 1024
+    return 100 * 1024 * 1024
+
+
 class GoogleDriveUpload(GoogleDriveHelper):
     def __init__(self, listener, path):
         self.listener = listener
         self._updater = None
         self._path = path
         self._is_errored = False
+        self._error = None
+        self._lock = Lock()
         super().__init__()
         self.is_uploading = True
 
@@ -102,25 +119,60 @@ class GoogleDriveUpload(GoogleDriveHelper):
             return
 
     def _upload_dir(self, input_directory, dest_id):
-        list_dirs = listdir(input_directory)
-        if len(list_dirs) == 0:
+        files = []
+        self._list_dir(input_directory, dest_id, files)
+        workers = min(Config.GDRIVE_UPLOAD_WORKERS, len(files))
+        if workers <= 1:
+            for file_path, file_name, parent_id in files:
+                if self.listener.is_cancelled:
+                    break
+                mime_type = get_mime_type(file_path)
+                self._upload_file(file_path, file_name, mime_type, parent_id)
+                self.total_files += 1
             return dest_id
-        new_id = None
-        for item in list_dirs:
+        jobs = Queue()
+        for job in files:
+            jobs.put(job)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for _ in range(workers):
+                executor.submit(self._upload_worker, jobs)
+        if self._error:
+            raise self._error
+        return dest_id
+
+    def _list_dir(self, input_directory, dest_id, files):
+        for item in listdir(input_directory):
+            if self.listener.is_cancelled:
+                return
             current_file_name = ospath.join(input_directory, item)
             if ospath.isdir(current_file_name):
                 current_dir_id = self.create_directory(item, dest_id)
-                new_id = self._upload_dir(current_file_name, current_dir_id)
+                self._list_dir(current_file_name, current_dir_id, files)
                 self.total_folders += 1
             else:
-                mime_type = get_mime_type(current_file_name)
-                file_name = current_file_name.split("/")[-1]
-                self._upload_file(current_file_name, file_name, mime_type, dest_id)
-                self.total_files += 1
-                new_id = dest_id
-            if self.listener.is_cancelled:
-                break
-        return new_id
+                files.append((current_file_name, item, dest_id))
+
+    def _upload_worker(self, jobs):
+        worker = GoogleDriveUpload(self.listener, self._path)
+        worker.token_path = self.token_path
+        worker.use_sa = self.use_sa
+        try:
+            worker.service = worker.authorize()
+            self.workers.append(worker)
+            while not self.listener.is_cancelled and not self._error:
+                try:
+                    file_path, file_name, parent_id = jobs.get_nowait()
+                except Empty:
+                    break
+                mime_type = get_mime_type(file_path)
+                worker._upload_file(file_path, file_name, mime_type, parent_id)
+                with self._lock:
+                    self.total_files += 1
+        except Exception as e:
+            with self._lock:
+                self._error = self._error or e
+        finally:
+            worker.status = None
 
     @retry(
         wait=wait_exponential(multiplier=2, min=3, max=6),
@@ -155,7 +207,10 @@ class GoogleDriveUpload(GoogleDriveHelper):
             )
             return self.G_DRIVE_BASE_DOWNLOAD_URL.format(drive_file.get("id"))
         media_body = MediaFileUpload(
-            file_path, mimetype=mime_type, resumable=True, chunksize=100 * 1024 * 1024
+            file_path,
+            mimetype=mime_type,
+            resumable=True,
+            chunksize=get_chunk_size(ospath.getsize(file_path)),
         )
 
         drive_file = self.service.files().create(
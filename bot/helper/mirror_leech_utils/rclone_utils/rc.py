@@ -0,0 +1,185 @@
+from aiofiles.os import makedirs, path as aiopath, remove
+from asyncio import Lock, create_subprocess_exec, sleep
+from asyncio.subprocess import DEVNULL
+from httpx import AsyncClient, AsyncHTTPTransport, HTTPError
+from logging import getLogger
+from os import path as ospath
+from secrets import token_hex
+
+LOGGER = getLogger(__name__)
+
+RCD_DIR = "rclone_rcd"
+
+# flag: (options group, option name, value type or None for switches)
+RC_FLAGS = {
+    "--fast-list": ("_config", "UseListR", None),
+    "-M": ("_config", "Metadata", None),
+    "--retries-sleep": ("_config", "RetriesInterval", str),
+    "--low-level-retries": ("_config", "LowLevelRetries", int),
+    "--tpslimit": ("_config", "TPSLimit", float),
+    "--tpslimit-burst": ("_config", "TPSLimitBurst", int),
+    "--transfers": ("_config", "Transfers", int),
+    "--ignore-case": ("_filter", "IgnoreCase", None),
+    "--exclude": ("_filter", "ExcludeRule", list),
+    "--files-from": ("_filter", "FilesFrom", list),
+}
+BACKEND_FLAGS = {
+    "--drive-acknowledge-abuse": ("acknowledge_abuse", None),
+    "--drive-chunk-size": ("chunk_size", str),
+}
+DIR_METHODS = {"copy": "sync/copy", "move": "sync/move", "sync": "sync/sync"}
+FILE_METHODS = {"copy": "operations/copyfile", "move": "operations/movefile"}
+
+
+class RcloneRcError(Exception):
+    pass
+
+
+def _split_remote(path):
+    remote, sep, rpath = path.partition(":")
+    if not sep or "/" in remote:
+        return None, path
+    return remote, rpath
+
+
+def _with_backend(path, backend):
+    remote, rpath = _split_remote(path)
+    if remote is None:
+        return path
+    return f"{remote},{','.join(backend)}:{rpath}"
+
+
+def _fs_root(path, rpath):
+    return path[: len(path) - len(rpath)]
+
+
+def parse_command(cmd):
+    """Translates a `rclone <method> ... -P <src> <dst> ...` command into
+    (method, src, dst, options), or None when a flag has no rc equivalent."""
+    method, source, destination = cmd[1], cmd[6], cmd[7]
+    if method not in DIR_METHODS:
+        return None
+    options = {"_config": {}, "_filter": {}}
+    backend = []
+    args = cmd[2:6] + cmd[8:]
+    index = 0
+    while index < len(args):
+        flag = args[index]
+        index += 1
+        # -L is a local backend option, so rcd starts with it
+        if flag in ["--config", "-P", "-L"]:
+            index += flag == "--config"
+            continue
+        if flag in RC_FLAGS:
+            group, name, kind = RC_FLAGS[flag]
+        elif flag in BACKEND_FLAGS:
+            group = None
+            name, kind = BACKEND_FLAGS[flag]
+        else:
+            return None
+        if kind is None:
+            value = True
+        else:
+            value = args[index]
+            index += 1
+            value = [value] if kind is list else kind(value)
+        if group is None:
+            backend.append(f"{name}={str(value).lower()}")
+        else:
+            options[group][name] = value
+    if backend:
+        source = _with_backend(source, backend)
+        destination = _with_backend(destination, backend)
+    return method, source, destination, options
+
+
+class RcloneRcd:
+    """A long-lived `rclone rcd` listening on a unix socket, one per config
+    file, that runs transfers as async jobs."""
+
+    _daemons = {}
+    _lock = Lock()
+
+    def __init__(self, config_path):
+        self.config_path = config_path
+        self._socket = ospath.abspath(f"{RCD_DIR}/{token_hex(4)}.sock")
+        self._proc = None
+        self._client = None
+
+    @classmethod
+    async def get(cls, config_path):
+        async with cls._lock:
+            rcd = cls._daemons.get(config_path)
+            if rcd is None or rcd._proc.returncode is not None:
+                rcd = cls(config_path)
+                await rcd._start()
+                cls._daemons[config_path] = rcd
+            return rcd
+
+    async def _start(self):
+        await makedirs(RCD_DIR, exist_ok=True)
+        if await aiopath.exists(self._socket):
+            await remove(self._socket)
+        self._proc = await create_subprocess_exec(
+            "rclone",
+            "rcd",
+            "--rc-no-auth",
+            "-L",
+            "--rc-addr",
+            f"unix://{self._socket}",
+            "--config",
+            self.config_path,
+            stdout=DEVNULL,
+            stderr=DEVNULL,
+        )
+        self._client = AsyncClient(
+            transport=AsyncHTTPTransport(uds=self._socket),
+            base_url="http://rclone",
+            timeout=60,
+        )
+        for _ in range(100):
+            if self._proc.returncode is not None:
+                break
+            try:
+                await self.call("rc/noop")
+                LOGGER.info(f"Started rclone rcd for {self.config_path}")
+                return
+            except (HTTPError, OSError, ValueError):
+                await sleep(0.1)
+        raise RcloneRcError(f"Unable to start rclone rcd for {self.config_path}")
+
+    async def call(self, method, **params):
+        res = await self._client.post(f"/{method}", json=params)
+        data = res.json()
+        if res.status_code != 200:
+            raise RcloneRcError(data.get("error", res.text))
+        return data
+
+    async def is_file(self, path):
+        remote, rpath = _split_remote(path)
+        if remote is None:
+            return await aiopath.isfile(path)
+        res = await self.call(
+            "operations/stat", fs=_fs_root(path, rpath), remote=rpath
+        )
+        return bool(res.get("item")) and not res["item"]["IsDir"]
+
+    async def start_job(self, method, source, destination, options):
+        if await self.is_file(source):
+            remote, rpath = _split_remote(source)
+            if remote is None:
+                src_fs, src_remote = ospath.split(source)
+            else:
+                src_fs, src_remote = _fs_root(source, rpath), rpath
+            params = {
+                "srcFs": src_fs,
+                "srcRemote": src_remote,
+                "dstFs": destination,
+                "dstRemote": src_remote.rsplit("/", 1)[-1],
+            }
+            method = FILE_METHODS.get(method, FILE_METHODS["copy"])
+        else:
+            params = {"srcFs": source, "dstFs": destination}
+            method = DIR_METHODS[method]
+        res = await self.call(method, _async=True, **params, **options)
+        return res["jobid"]
@@ -14,19 +14,25 @@ from ...ext_utils.files_utils import (
     get_mime_type,
     count_files_and_folders,
 )
+from ...ext_utils.status_utils import speed_string_to_bytes
+from .rc import RcloneRcd, parse_command
 
 LOGGER = getLogger(__name__)
 
+ETA_UNITS = {"w": 604800, "d": 86400, "h": 3600, "m": 60, "s": 1}
+
 
 class RcloneTransferHelper:
     def __init__(self, listener):
         self._listener = listener
         self._proc = None
-        self._transferred_size = "0 B"
-        self._eta = "-"
-        self._percentage = "0%"
-        self._speed = "0 B/s"
-        self._size = "0 B"
+        self._rc_job = None
+        self._transferred_size = 0
+        self._eta = None
+        self._percentage = 0
+        self._speed = 0
+        self._size = 0
+        self._transfers = []
         self._is_download = False
         self._is_upload = False
         self._sa_count = 1
@@ -55,6 +61,10 @@ class RcloneTransferHelper:
     def size(self):
         return self._size
 
+    @property
+    def transfers(self):
+        return self._transfers
+
     async def _progress(self):
         while not (
             self._proc.returncode is not None
@@ -72,15 +82,65 @@ class RcloneTransferHelper:
                 r"Transferred:\s+([\d.]+\s*\w+)\s+/\s+([\d.]+\s*\w+),\s+([\d.]+%)\s*,\s+([\d.]+\s*\w+/s),\s+ETA\s+([\dwdhms]+)",
                 data,
             ):
-                (
-                    self._transferred_size,
-                    self._size,
-                    self._percentage,
-                    self._speed,
-                    self._eta,
-                ) = data[0]
+                transferred, size, percentage, speed, eta = data[0]
+                self._transferred_size = speed_string_to_bytes(transferred)
+                self._size = speed_string_to_bytes(size)
+                self._percentage = float(percentage.strip("%"))
+                self._speed = speed_string_to_bytes(speed)
+                if periods := re_findall(r"(\d+)([wdhms])", eta):
+                    self._eta = sum(int(v) * ETA_UNITS[u] for v, u in periods)
+                else:
+                    self._eta = None
             await sleep(0.05)
 
+    async def _run(self, cmd):
+        if Config.RCLONE_RCD and (job := parse_command(cmd)):
+            return await self._run_rc(cmd[4], *job)
+        self._proc = await create_subprocess_exec(*cmd, stdout=PIPE, stderr=PIPE)
+        await self._progress()
+        _, stderr = await self._proc.communicate()
+        return self._proc.returncode, stderr.decode().strip()
+
+    async def _run_rc(self, config_path, method, source, destination, options):
+        try:
+            rcd = await RcloneRcd.get(config_path)
+            jobid = await rcd.start_job(method, source, destination, options)
+        except Exception as e:
+            return 1, str(e)
+        self._rc_job = (rcd, jobid)
+        group = f"job/{jobid}"
+        status = {}
+        while not self._listener.is_cancelled:
+            try:
+                stats, status = await gather(
+                    rcd.call("core/stats", group=group),
+                    rcd.call("job/status", jobid=jobid),
+                )
+            except Exception as e:
+                status = {"finished": True, "success": False, "error": str(e)}
+                break
+            self._transferred_size = stats.get("bytes", 0)
+            self._size = stats.get("totalBytes", 0)
+            self._speed = stats.get("speed", 0)
+            self._eta = stats.get("eta")
+            self._percentage = (
+                self._transferred_size / self._size * 100 if self._size else 0
+            )
+            self._transfers = stats.get("transferring", [])
+            if status.get("finished"):
+                break
+            await sleep(1)
+        self._rc_job = None
+        try:
+            await rcd.call("core/stats-delete", group=group)
+        except Exception:
+            pass
+        if self._listener.is_cancelled:
+            return -9, ""
+        if status.get("success"):
+            return 0, ""
+        return 1, status.get("error", "")
+
     def _switch_service_account(self):
         if self._sa_index == self._sa_number - 1:
             self._sa_index = 0
@@ -117,17 +177,13 @@ class RcloneTransferHelper:
         return sa_conf_file
 
     async def _start_download(self, cmd, remote_type):
-        self._proc = await create_subprocess_exec(*cmd, stdout=PIPE, stderr=PIPE)
-        await self._progress()
-        _, stderr = await self._proc.communicate()
-        return_code = self._proc.returncode
+        return_code, error = await self._run(cmd)
         if self._listener.is_cancelled:
             return
 
         if return_code == 0:
             await self._listener.on_download_complete()
         elif return_code != -9:
-            error = stderr.decode().strip()
             if not error and remote_type == "drive" and self._use_service_accounts:
                 error = "Mostly your service accounts don't have access to this drive!"
             LOGGER.error(error)
@@ -229,10 +285,7 @@ class RcloneTransferHelper:
         return link
 
     async def _start_upload(self, cmd, remote_type):
-        self._proc = await create_subprocess_exec(*cmd, stdout=PIPE, stderr=PIPE)
-        await self._progress()
-        _, stderr = await self._proc.communicate()
-        return_code = self._proc.returncode
+        return_code, error = await self._run(cmd)
 
         if self._listener.is_cancelled:
             return False
@@ -241,7 +294,6 @@ class RcloneTransferHelper:
         elif return_code == 0:
             return True
         else:
-            error = stderr.decode().strip()
             LOGGER.error(error)
             if (
                 self._sa_number != 0
@@ -393,10 +445,7 @@ class RcloneTransferHelper:
                 )
             )
 
-        self._proc = await create_subprocess_exec(*cmd, stdout=PIPE, stderr=PIPE)
-        await self._progress()
-        _, stderr = await self._proc.communicate()
-        return_code = self._proc.returncode
+        return_code, error = await self._run(cmd)
 
         if self._listener.is_cancelled:
             return None, None
@@ -435,7 +484,6 @@ class RcloneTransferHelper:
                     return None, destination
 
         else:
-            error = stderr.decode().strip()
             LOGGER.error(error)
             await self._listener.on_upload_error(error[:4000])
             return None, None
@@ -494,6 +542,12 @@ class RcloneTransferHelper:
 
     async def cancel_task(self):
         self._listener.is_cancelled = True
+        if self._rc_job is not None:
+            rcd, jobid = self._rc_job
+            try:
+                await rcd.call("job/stop", jobid=jobid)
+            except Exception:
+                pass
         if self._proc is not None:
             try:
                 self._proc.kill()
@@ -1,21 +1,37 @@
 from time import time
 
-from .... import LOGGER
+from .... import LOGGER, task_dict
 from ....core.torrent_manager import TorrentManager, aria2_name
 from ...ext_utils.status_utils import (
+    EngineSnapshot,
     MirrorStatus,
     get_readable_time,
     get_readable_file_size,
 )
 
 
+async def _fetch_downloads(gids):
+    if not gids:
+        return {}
+    results = await TorrentManager.aria2.multicall(
+        [{"methodName": "aria2.tellStatus", "params": [gid]} for gid in gids]
+    )
+    downloads = {}
+    for gid, res in zip(gids, results):
+        if isinstance(res, list):
+            downloads[gid] = res[0]
+        else:
+            LOGGER.error(
+                f"{res.get('faultString', res)}: Aria2c, Error while getting torrent info"
+            )
+    return downloads
+
+
+aria2_snapshot = EngineSnapshot("Aria2c", _fetch_downloads)
+
+
 async def get_download(gid, old_info=None):
-    try:
-        res = await TorrentManager.aria2.tellStatus(gid)
-        return res or old_info
-    except Exception as e:
-        LOGGER.error(f"{e}: Aria2c, Error while getting torrent info")
-        return old_info
+    return await aria2_snapshot.get(gid) or old_info
 
 
 class Aria2Status:
@@ -33,6 +49,7 @@ class Aria2Status:
         if self._download.get("followedBy", []):
             self._gid = self._download["followedBy"][0]
             self._download = await get_download(self._gid)
+            task_dict.reindex(self)
 
     def progress(self):
         try:
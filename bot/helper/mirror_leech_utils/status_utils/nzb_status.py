@@ -2,6 +2,7 @@ from asyncio import gather
 
 from .... import LOGGER, sabnzbd_client, nzb_jobs, nzb_listener_lock
 from ...ext_utils.status_utils import (
+    EngineSnapshot,
     MirrorStatus,
     get_readable_file_size,
     get_readable_time,
@@ -9,45 +10,54 @@ from ...ext_utils.status_utils import (
 )
 
 
+async def _fetch_jobs(nzo_ids):
+    if not nzo_ids:
+        return {}
+    queue = await sabnzbd_client.get_downloads(nzo_ids=nzo_ids)
+    jobs = {slot["nzo_id"]: ("queue", slot) for slot in queue["queue"]["slots"]}
+    if missing := [nzo_id for nzo_id in nzo_ids if nzo_id not in jobs]:
+        history = await sabnzbd_client.get_history(nzo_ids=missing)
+        for slot in history["history"]["slots"]:
+            jobs[slot["nzo_id"]] = ("history", slot)
+    return jobs
+
+
+nzb_snapshot = EngineSnapshot("Sabnzbd", _fetch_jobs)
+
+
 async def get_download(nzo_id, old_info=None):
     try:
-        queue = await sabnzbd_client.get_downloads(nzo_ids=nzo_id)
-        if res := queue["queue"]["slots"]:
-            slot = res[0]
+        kind, slot = await nzb_snapshot.get(nzo_id) or (None, None)
+        if kind == "queue":
             if msg := slot["labels"]:
                 LOGGER.warning(" | ".join(msg))
             return slot
-        else:
-            history = await sabnzbd_client.get_history(nzo_ids=nzo_id)
-            if res := history["history"]["slots"]:
-                slot = res[0]
-                if slot["status"] == "Verifying":
-                    percentage = slot["action_line"].split("Verifying: ")[-1].split("/")
-                    percentage = round(
-                        (int(float(percentage[0])) / int(float(percentage[1]))) * 100, 2
-                    )
-                    old_info["percentage"] = percentage
-                elif slot["status"] == "Repairing":
-                    action = slot["action_line"].split("Repairing: ")[-1].split()
-                    percentage = action[0].strip("%")
-                    eta = action[2]
-                    old_info["percentage"] = percentage
-                    old_info["timeleft"] = eta
-                elif slot["status"] == "Extracting":
-                    if "Unpacking" in slot["action_line"]:
-                        action = slot["action_line"].split("Unpacking: ")[-1].split()
-                    else:
-                        action = (
-                            slot["action_line"].split("Direct Unpack: ")[-1].split()
-                        )
-                    percentage = action[0].split("/")
-                    percentage = round(
-                        (int(float(percentage[0])) / int(float(percentage[1]))) * 100, 2
-                    )
-                    eta = action[2]
-                    old_info["percentage"] = percentage
-                    old_info["timeleft"] = eta
-                old_info["status"] = slot["status"]
+        elif kind == "history":
+            if slot["status"] == "Verifying":
+                percentage = slot["action_line"].split("Verifying: ")[-1].split("/")
+                percentage = round(
+                    (int(float(percentage[0])) / int(float(percentage[1]))) * 100, 2
+                )
+                old_info["percentage"] = percentage
+            elif slot["status"] == "Repairing":
+                action = slot["action_line"].split("Repairing: ")[-1].split()
+                percentage = action[0].strip("%")
+                eta = action[2]
+                old_info["percentage"] = percentage
+                old_info["timeleft"] = eta
+            elif slot["status"] == "Extracting":
+                if "Unpacking" in slot["action_line"]:
+                    action = slot["action_line"].split("Unpacking: ")[-1].split()
+                else:
+                    action = slot["action_line"].split("Direct Unpack: ")[-1].split()
+                percentage = action[0].split("/")
+                percentage = round(
+                    (int(float(percentage[0])) / int(float(percentage[1]))) * 100, 2
+                )
+                eta = action[2]
+                old_info["percentage"] = percentage
+                old_info["timeleft"] = eta
+            old_info["status"] = slot["status"]
         return old_info
     except Exception as e:
         LOGGER.error(f"{e}: Sabnzbd, while getting job info. ID: {nzo_id}")
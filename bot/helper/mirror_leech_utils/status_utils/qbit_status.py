@@ -1,21 +1,25 @@
 from asyncio import sleep, gather
 
-from .... import LOGGER, qb_torrents, qb_listener_lock
+from .... import LOGGER, qb_torrents, qb_listener_lock, task_dict
 from ....core.torrent_manager import TorrentManager
 from ...ext_utils.status_utils import (
+    EngineSnapshot,
     MirrorStatus,
     get_readable_file_size,
     get_readable_time,
 )
 
 
+async def _fetch_torrents(_):
+    torrents = await TorrentManager.qbittorrent.torrents.info()
+    return {tag: torrent for torrent in torrents for tag in torrent.tags}
+
+
+qb_snapshot = EngineSnapshot("Qbittorrent", _fetch_torrents)
+
+
 async def get_download(tag, old_info=None):
-    try:
-        res = (await TorrentManager.qbittorrent.torrents.info(tag=tag))[0]
-        return res or old_info
-    except Exception as e:
-        LOGGER.error(f"{e}: Qbittorrent, while getting torrent info. Tag: {tag}")
-        return old_info
+    return await qb_snapshot.get(tag) or old_info
 
 
 class QbittorrentStatus:
@@ -27,7 +31,10 @@ class QbittorrentStatus:
         self.tool = "qbittorrent"
 
     async def update(self):
+        indexed = self._info is not None
         self._info = await get_download(f"{self.listener.mid}", self._info)
+        if not indexed and self._info is not None:
+            task_dict.reindex(self)
 
     def progress(self):
         return f"{round(self._info.progress * 100, 2)}%"
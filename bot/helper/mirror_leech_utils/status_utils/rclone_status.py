@@ -1,4 +1,8 @@
-from ...ext_utils.status_utils import MirrorStatus
+from ...ext_utils.status_utils import (
+    MirrorStatus,
+    get_readable_file_size,
+    get_readable_time,
+)
 
 
 class RcloneStatus:
@@ -13,19 +17,21 @@ class RcloneStatus:
         return self._gid
 
     def progress(self):
-        return self._obj.percentage
+        return f"{round(self._obj.percentage, 2)}%"
 
     def speed(self):
-        return self._obj.speed
+        return f"{get_readable_file_size(self._obj.speed)}/s"
 
     def name(self):
         return self.listener.name
 
     def size(self):
-        return self._obj.size
+        return get_readable_file_size(self._obj.size)
 
     def eta(self):
-        return self._obj.eta
+        if self._obj.eta is None:
+            return "-"
+        return get_readable_time(self._obj.eta) or "0s"
 
     def status(self):
         if self._status == "dl":
@@ -36,7 +42,7 @@ class RcloneStatus:
             return MirrorStatus.STATUS_CLONE
 
     def processed_bytes(self):
-        return self._obj.transferred_size
+        return get_readable_file_size(self._obj.transferred_size)
 
     def task(self):
         return self._obj
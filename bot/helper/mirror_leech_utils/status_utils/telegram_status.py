@@ -9,7 +9,6 @@ class TelegramStatus:
     def __init__(self, listener, obj, gid, status):
         self.listener = listener
         self._obj = obj
-        self._size = self.listener.size
         self._gid = gid
         self._status = status
         self.tool = "telegram"
@@ -18,7 +17,7 @@ class TelegramStatus:
         return get_readable_file_size(self._obj.processed_bytes)
 
     def size(self):
-        return get_readable_file_size(self._size)
+        return get_readable_file_size(self.listener.size)
 
     def status(self):
         if self._status == "up":
@@ -30,7 +29,7 @@ class TelegramStatus:
 
     def progress(self):
         try:
-            progress_raw = self._obj.processed_bytes / self._size * 100
+            progress_raw = self._obj.processed_bytes / self.listener.size * 100
         except:
             progress_raw = 0
         return f"{round(progress_raw, 2)}%"
@@ -40,7 +39,7 @@ class TelegramStatus:
 
     def eta(self):
         try:
-            seconds = (self._size - self._obj.processed_bytes) / self._obj.speed
+            seconds = (self.listener.size - self._obj.processed_bytes) / self._obj.speed
             return get_readable_time(seconds)
         except:
             return "-"
@@ -48,5 +47,8 @@ class TelegramStatus:
     def gid(self):
         return self._gid
 
+    def stages(self):
+        return getattr(self._obj, "stages", "")
+
     def task(self):
         return self._obj
@@ -0,0 +1,163 @@
+from aiofiles.os import makedirs, link, path as aiopath, remove
+from asyncio import Lock
+from natsort import natsorted
+from os import path as ospath
+
+from ... import LOGGER, task_dict, task_dict_lock
+from ...core.config_manager import Config
+from ...core.torrent_manager import TorrentManager
+from ..ext_utils.bot_utils import SetInterval
+from ..ext_utils.files_utils import clean_download
+from ..ext_utils.task_manager import claim_upload_slot
+from .status_utils.aria2_status import get_download as get_aria2_download
+from .status_utils.qbit_status import get_download as get_qbit_download
+from .telegram_uploader import TelegramUploader
+
+STREAM_INTERVAL = 5
+
+
+def can_stream(listener):
+    """Streaming leech uploads each file as soon as it completes, so it is
+    only used when nothing has to run over the whole download first. Aria2c
+    tells whether a download is a torrent only after it started, so those
+    are checked again on every scan."""
+    return (
+        Config.STREAM_LEECH
+        and listener.is_leech
+        and not (
+            listener.is_nzb
+            or listener.is_jd
+            or listener.is_ytdlp
+            or listener.is_clone
+        )
+        and not (
+            listener.seed
+            or listener.same_dir
+            or listener.folder_name
+            or listener.join
+            or listener.extract
+            or listener.compress
+            or listener.name_sub
+            or listener.ffmpeg_cmds
+            or listener.screen_shots
+            or listener.sample_video
+            or listener.convert_audio
+            or listener.convert_video
+        )
+    )
+
+
+class StreamLeech:
+    def __init__(self, listener):
+        self._listener = listener
+        self._stage_dir = f"{listener.dir}10001"
+        self._seen = set()
+        self._lock = Lock()
+        self._interval = None
+        self.streamed = []
+        self.size = 0
+        self.uploader = None
+
+    def start(self):
+        self._interval = SetInterval(STREAM_INTERVAL, self._scan)
+
+    async def _completed_files(self):
+        async with task_dict_lock:
+            task = task_dict.get(self._listener.mid)
+        if task is None or getattr(task, "queued", False):
+            return []
+        if task.tool == "qbittorrent":
+            info = await get_qbit_download(f"{self._listener.mid}")
+            if info is None or info.progress >= 1:
+                return []
+            files = await TorrentManager.qbittorrent.torrents.files(info.hash)
+            if len(files) <= 1:
+                return []
+            base = getattr(info, "download_path", "") or info.save_path
+            return [
+                (ospath.join(base, f.name), f.size)
+                for f in files
+                if f.priority != 0 and f.progress >= 1
+            ]
+        if task.tool == "aria2":
+            download = await get_aria2_download(task.gid())
+            if not download or download.get("status") != "active":
+                return []
+            files = download.get("files", [])
+            if len(files) <= 1:
+                return []
+            return [
+                (f["path"], int(f["length"]))
+                for f in files
+                if f.get("selected") == "true"
+                and int(f["length"])
+                and f["completedLength"] == f["length"]
+            ]
+        return []
+
+    async def _scan(self):
+        async with self._lock:
+            if self._listener.is_cancelled or self._interval is None:
+                return
+            if not (self._listener.is_qbit or self._listener.is_torrent):
+                return
+            try:
+                files = await self._completed_files()
+            except Exception as e:
+                LOGGER.error(f"Stream leech: unable to get completed files. {e}")
+                return
+            for f_path, size in natsorted(files):
+                if f_path in self._seen or self._listener.is_cancelled:
+                    continue
+                if not f_path.startswith(f"{self._listener.dir}/"):
+                    self._seen.add(f_path)
+                    continue
+                if f_path.strip().lower().endswith(
+                    tuple(self._listener.excluded_extensions)
+                ):
+                    self._seen.add(f_path)
+                    continue
+                if not await aiopath.isfile(f_path):
+                    # not renamed or moved in place yet
+                    continue
+                if not await claim_upload_slot(self._listener):
+                    # the file waits for a free upload slot or the download end
+                    return
+                self._seen.add(f_path)
+                staged = f_path.replace(self._listener.dir, self._stage_dir, 1)
+                try:
+                    await makedirs(ospath.dirname(staged), exist_ok=True)
+                    # the engine still owns the original while downloading
+                    await link(f_path, staged)
+                except OSError as e:
+                    LOGGER.error(f"Stream leech: unable to stage {f_path}. {e}")
+                    continue
+                if self.uploader is None:
+                    self.uploader = TelegramUploader(
+                        self._listener, self._listener.dir
+                    )
+                LOGGER.info(f"Stream leech: {f_path}")
+                if not await self.uploader.stream(staged):
+                    self._stop()
+                    return
+                self.streamed.append(f_path)
+                self.size += size
+
+    def _stop(self):
+        if self._interval is not None:
+            self._interval.cancel()
+            self._interval = None
+
+    async def finish(self):
+        """Stops streaming once the download completed and removes the
+        streamed files, so the rest of the task only handles what is left."""
+        async with self._lock:
+            self._stop()
+        for f_path in self.streamed:
+            if await aiopath.exists(f_path):
+                await remove(f_path)
+
+    async def clean(self):
+        async with self._lock:
+            self._stop()
+        await clean_download(self._stage_dir)
@@ -1,11 +1,13 @@
 from PIL import Image
 from aioshutil import rmtree
-from asyncio import sleep
+from asyncio import sleep, gather, wait_for, Event, Semaphore, TimeoutError
+from collections import deque
+from contextlib import nullcontext
 from logging import getLogger
 from natsort import natsorted
 from os import walk, path as ospath
 from time import time
-from re import match as re_match, sub as re_sub
+from re import match as re_match, sub as re_sub, escape
 from pyrogram.errors import FloodWait, RPCError, FloodPremiumWait, BadRequest
 from aiofiles.os import (
     remove,
@@ -26,7 +28,7 @@ from tenacity import (
     RetryError,
 )
 
-from bot import bot_loop
+from bot import bot_loop, cpu_eater_lock
 from bot.core.config_manager import Config
 from bot.core.mltb_client import TgClient
 from bot.helper.ext_utils.bot_utils import sync_to_async
@@ -34,6 +36,7 @@ from bot.helper.ext_utils.files_utils import is_archive, get_base_name, split_fi
 from ..ext_utils.mkvmerge_utils import split_video_if_needed
 from bot.helper.telegram_helper.message_utils import delete_message
 from bot.helper.ext_utils.media_utils import (
+    FFMpeg,
     get_media_info,
     get_document_type,
     get_video_thumbnail,
@@ -43,10 +46,22 @@ from bot.helper.ext_utils.media_utils import (
 
 LOGGER = getLogger(__name__)
 
+_upload_slots = {"limit": 0, "semaphore": None}
+
+
+def get_upload_slots():
+    limit = Config.LEECH_GLOBAL_UPLOADS
+    if not limit:
+        return nullcontext()
+    if _upload_slots["limit"] != limit:
+        _upload_slots["limit"] = limit
+        _upload_slots["semaphore"] = Semaphore(limit)
+    return _upload_slots["semaphore"]
+
 
 class TelegramUploader:
-    def __init__(self, listener, path):
-        self._last_uploaded = 0
+    def __init__(self, listener, path, convert=False):
+        self._last_uploaded = {}
         self._processed_bytes = 0
         self._listener = listener
         self._path = path
@@ -55,27 +70,38 @@ class TelegramUploader:
         self._thumb = self._listener.thumb or f"thumbnails/{listener.user_id}.jpg"
         self._msgs_dict = {}
         self._corrupted = 0
-        self._is_corrupted = False
         self._media_dict = {"videos": {}, "documents": {}}
         self._last_msg_in_group = False
-        self._up_path = ""
         self._lprefix = ""
         self._media_group = False
         self._is_private = False
         self._sent_msg = None
         self._user_session = self._listener.user_transmission
         self._error = ""
+        self._prepared = False
+        # Each file uploads its bytes right away and waits for the event of the
+        # file before it only to send and commit its message, so uploads
+        # overlap while messages, media groups and _msgs_dict keep the queue
+        # order.
+        self._upload_queue = deque()
+        self._turn = Event()
+        self._turn.set()
+        self._queued = Event()
+        self._queued.set()
+        self._workers = []
+        # files are converted and split by the process workers while the
+        # upload workers send the files before them
+        self._processors = Semaphore(max(1, Config.LEECH_PROCESS_WORKERS))
+        self._convert = listener.convert_options() if convert else None
+        self._stages = {"Convert": [0, 0], "Split": [0, 0], "Upload": [0, 0]}
         self._listener.total_parts = 0
-        self._listener.current_part = 0
+        self._listener.current_part = 1
 
-    async def _upload_progress(self, current, _):
+    async def _upload_progress(self, current, _, up_path, client):
         if self._listener.is_cancelled:
-            if self._user_session:
-                TgClient.user.stop_transmission()
-            else:
-                self._listener.client.stop_transmission()
-        chunk_size = current - self._last_uploaded
-        self._last_uploaded = current
+            client.stop_transmission()
+        chunk_size = current - self._last_uploaded.get(up_path, 0)
+        self._last_uploaded[up_path] = current
         self._processed_bytes += chunk_size
 
     async def _user_settings(self):
@@ -135,13 +161,13 @@ class TelegramUploader:
             self._sent_msg = self._listener.message
         return True
 
-    async def _prepare_file(self, file_, dirpath):
+    async def _prepare_file(self, file_, dirpath, up_path):
         if self._lprefix:
             cap_mono = f"{self._lprefix} <code>{file_}</code>"
             self._lprefix = re_sub("<.*?>", "", self._lprefix)
             new_path = ospath.join(dirpath, f"{self._lprefix} {file_}")
-            await rename(self._up_path, new_path)
-            self._up_path = new_path
+            await rename(up_path, new_path)
+            up_path = new_path
         else:
             cap_mono = f"<code>{file_}</code>"
         if len(file_) > 60:
@@ -161,9 +187,9 @@ class TelegramUploader:
             remain = 60 - extn
             name = name[:remain]
             new_path = ospath.join(dirpath, f"{name}{ext}")
-            await rename(self._up_path, new_path)
-            self._up_path = new_path
-        return cap_mono
+            await rename(up_path, new_path)
+            up_path = new_path
+        return cap_mono, up_path
 
     def _get_input_media(self, subkey, key):
         rlist = []
@@ -219,10 +245,170 @@ class TelegramUploader:
                 self._msgs_dict[m.link] = m.caption
         self._sent_msg = msgs_list[-1]
 
-    async def upload(self):
-        await self._user_settings()
-        res = await self._msg_to_reply()
+    async def _flush_media_groups(self, f_path):
+        if self._last_msg_in_group:
+            group_lists = [x for v in self._media_dict.values() for x in v.keys()]
+            match = re_match(r".+(?=\..+\.0*\d+$)|.+(?=\.part\d+\..+$)", f_path)
+            if not match or match and match.group(0) not in group_lists:
+                for key, value in list(self._media_dict.items()):
+                    for subkey, msgs in list(value.items()):
+                        if len(msgs) > 1:
+                            await self._send_media_group(subkey, key, msgs)
+        self._last_msg_in_group = False
+
+    async def _add_to_media_group(self, sent_msg, o_path):
+        if not (self._media_group and (sent_msg.video or sent_msg.document)):
+            return
+        key = "documents" if sent_msg.document else "videos"
+        if match := re_match(r".+(?=\.0*\d+$)|.+(?=\.part\d+\..+$)", o_path):
+            pname = match.group(0)
+            if pname in self._media_dict[key].keys():
+                self._media_dict[key][pname].append([sent_msg.chat.id, sent_msg.id])
+            else:
+                self._media_dict[key][pname] = [[sent_msg.chat.id, sent_msg.id]]
+            msgs = self._media_dict[key][pname]
+            if len(msgs) == 10:
+                await self._send_media_group(pname, key, msgs)
+            else:
+                self._last_msg_in_group = True
+
+    async def _convert_if_needed(self, f_path):
+        if not self._convert:
+            return f_path
+        convert = await self._listener.get_convert_type(f_path, self._convert)
+        if not convert:
+            return f_path
+        f_type, ext = convert
+        self._stages["Convert"][1] += 1
+        ffmpeg = FFMpeg(self._listener)
+        async with cpu_eater_lock:
+            LOGGER.info(f"Converting: {f_path}")
+            if f_type == "video":
+                res = await ffmpeg.convert_video(f_path, ext)
+            else:
+                res = await ffmpeg.convert_audio(f_path, ext)
+        self._stages["Convert"][0] += 1
         if not res:
+            return f_path
+        await self._resize([f_path], [res])
+        await remove(f_path)
+        if self._listener.is_file:
+            self._listener.name = ospath.basename(res)
+        return res
+
+    async def _split_if_needed(self, f_path):
+        f_size = await aiopath.getsize(f_path)
+        split_size = self._listener.split_size or self._listener.max_split_size
+        if f_size <= split_size or f_path.endswith(".zip"):
+            return [f_path]
+        self._stages["Split"][1] += 1
+        try:
+            return await self._split(f_path, f_size, split_size)
+        finally:
+            self._stages["Split"][0] += 1
+
+    async def _split(self, f_path, f_size, split_size):
+        is_video, _, _ = await get_document_type(f_path)
+        parts = []
+        if is_video and f_path.endswith(".mkv"):
+            LOGGER.info(f"Splitting video with mkvmerge: {f_path}")
+            parts = await split_video_if_needed(f_path, split_size)
+            if parts == [f_path]:
+                parts = []
+        if not parts:
+            LOGGER.info(f"Splitting by bytes: {f_path}")
+            if self._listener.equal_splits:
+                count = -(-f_size // split_size)
+                split_size = (f_size // count) + (f_size % count)
+            if await split_file(f_path, split_size, self._listener):
+                dir_path, base_name = ospath.split(f_path)
+                parts = natsorted(
+                    [
+                        ospath.join(dir_path, f)
+                        for f in await listdir(dir_path)
+                        if re_match(rf"{escape(base_name)}\.\d+$", f)
+                    ]
+                )
+        if not parts:
+            LOGGER.error(f"Splitting failed for {f_path}. Uploading as a single file.")
+            return [f_path]
+        await self._resize([f_path], parts)
+        await remove(f_path)
+        return parts
+
+    async def _resize(self, old, new):
+        # keeps the task size, which the status reads, in line with the
+        # files actually uploaded
+        sizes = await gather(*(aiopath.getsize(f) for f in old + new))
+        self._listener.size += sum(sizes[len(old) :]) - sum(sizes[: len(old)])
+
+    async def _prepare(self):
+        if not self._prepared:
+            await self._user_settings()
+            self._prepared = await self._msg_to_reply()
+        return self._prepared
+
+    def _reserve(self):
+        turn, self._turn = self._turn, Event()
+        queued, self._queued = self._queued, Event()
+        return turn, self._turn, queued, self._queued
+
+    async def _process_file(self, f_path, turn, done, queued, next_queued):
+        """Converts and splits one file, then queues its parts for the upload
+        workers between the `turn` and `done` events reserved for the file.
+        Files are processed in parallel but queued in order, after `queued`."""
+        async with self._processors:
+            if self._listener.is_cancelled:
+                parts = []
+            else:
+                try:
+                    parts = await self._split_if_needed(
+                        await self._convert_if_needed(f_path)
+                    )
+                except Exception as e:
+                    LOGGER.error(f"{e}. Unable to process {f_path}")
+                    parts = [f_path]
+        if not await self._wait_done(queued):
+            return
+        if parts:
+            for index, part in enumerate(parts):
+                part_done = done if index == len(parts) - 1 else Event()
+                self._upload_queue.append((part, turn, part_done))
+                turn = part_done
+            self._listener.total_parts += len(parts)
+            self._stages["Upload"][1] += len(parts)
+        next_queued.set()
+        if parts:
+            self._start_workers()
+        elif await self._wait_done(turn):
+            done.set()
+
+    async def _wait_done(self, done):
+        while not done.is_set():
+            if self._listener.is_cancelled:
+                return False
+            try:
+                await wait_for(done.wait(), 1)
+            except TimeoutError:
+                pass
+        return True
+
+    def _start_workers(self):
+        self._workers = [worker for worker in self._workers if not worker.done()]
+        workers = max(1, Config.LEECH_PARALLEL_UPLOADS) - len(self._workers)
+        for _ in range(workers):
+            self._workers.append(bot_loop.create_task(self._upload_worker()))
+
+    async def stream(self, f_path):
+        """Uploads a file of a task that is still downloading. `upload` then
+        waits for it and sends the rest of the task."""
+        if not await self._prepare():
+            return False
+        await self._process_file(f_path, *self._reserve())
+        return True
+
+    async def upload(self):
+        if not await self._prepare():
             return
 
         files_to_upload = []
@@ -239,127 +425,152 @@ class TelegramUploader:
         else:
             files_to_upload.append(self._path)
 
-        self._listener.total_parts = len(files_to_upload)
-        self._listener.current_part = 1
-
-        upload_queue = deque(files_to_upload)
-
-        while upload_queue:
-            f_path = upload_queue.popleft()
-            if self._listener.is_cancelled:
-                return
+        # at most this many files are converted, split or waiting for upload
+        window = max(1, Config.LEECH_PROCESS_WORKERS) + max(
+            1, Config.LEECH_PARALLEL_UPLOADS
+        )
+        dones = []
+        processors = []
+        for f_path in files_to_upload:
+            if len(dones) >= window and not await self._wait_done(dones[-window]):
+                break
+            reserved = self._reserve()
+            dones.append(reserved[1])
+            processors.append(
+                bot_loop.create_task(self._process_file(f_path, *reserved))
+            )
+        await gather(*processors)
+        if self._listener.is_cancelled:
+            return
 
-            f_size = await aiopath.getsize(f_path)
-            if f_size > self._listener.max_split_size and not f_path.endswith('.zip'):
-                is_video, _, _ = await get_document_type(f_path)
-                parts = []
-                if is_video and f_path.endswith(".mkv"):
-                    LOGGER.info(f"Splitting video with mkvmerge: {f_path}")
-                    parts = await split_video_if_needed(f_path, self._listener.max_split_size)
-
-                if not parts:
-                    LOGGER.info(f"Splitting with 'split' command: {f_path}")
-                    if await split_file(f_path, f_size, ospath.basename(f_path), self._listener):
-                        dir_path = ospath.dirname(f_path)
-                        base_name = ospath.basename(f_path)
-                        parts = natsorted([ospath.join(dir_path, f) for f in await listdir(dir_path) if f.startswith(f"{base_name}.part")])
-
-                if parts:
-                    upload_queue.extendleft(reversed(parts))
-                    self._listener.total_parts += len(parts) - 1
-                    await remove(f_path)
-                else:
-                    LOGGER.error(f"Splitting failed for {f_path}. Uploading as a single file.")
-                    async for sent_message in self._upload_a_file(f_path):
-                        yield sent_message
-                    self._listener.current_part += 1
-            else:
-                async for sent_message in self._upload_a_file(f_path):
-                    yield sent_message
-                self._listener.current_part += 1
+        # a worker can exit right as a streamed file is queued, so drain again
+        while True:
+            self._start_workers()
+            await gather(*self._workers)
+            if not self._upload_queue or self._listener.is_cancelled:
+                break
 
+        if self._listener.is_cancelled:
+            return
+        for key, value in list(self._media_dict.items()):
+            for subkey, msgs in list(value.items()):
+                if len(msgs) > 1:
+                    await self._send_media_group(subkey, key, msgs)
+        if self._total_files == 0:
+            await self._listener.on_upload_error(
+                "No files to upload. In case you have filled EXCLUDED_EXTENSIONS, then check if all files have those extensions or not."
+            )
+            return
         if self._total_files <= self._corrupted:
             await self._listener.on_upload_error(
                 f"Files Corrupted or unable to upload. {self._error or 'Check logs!'}"
             )
+            return
+        LOGGER.info(f"Leech Completed: {self._listener.name}")
+        await self._listener.on_upload_complete(
+            None, self._msgs_dict, self._total_files, self._corrupted
+        )
+
+    async def _upload_worker(self):
+        while self._upload_queue and not self._listener.is_cancelled:
+            f_path, turn, done = self._upload_queue.popleft()
+            try:
+                await self._upload_a_file(f_path, turn)
+            finally:
+                # a file that returned early still passes the turn in order
+                await self._wait_done(turn)
+                done.set()
+            self._listener.current_part += 1
+            self._stages["Upload"][0] += 1
 
-    async def _upload_a_file(self, f_path):
+    async def _upload_a_file(self, f_path, turn):
         dirpath, file_ = ospath.split(f_path)
         self._error = ""
-        self._up_path = f_path
-        if not await aiopath.exists(self._up_path):
-            LOGGER.error(f"{self._up_path} not exists! Continue uploading!")
+        up_path = f_path
+        client = None
+        if not await aiopath.exists(up_path):
+            LOGGER.error(f"{up_path} not exists! Continue uploading!")
             return
         try:
             await self._listener.update_and_log_status(
                 f"Uploading... {self._listener.current_part}/{self._listener.total_parts}"
             )
-            f_size = await aiopath.getsize(self._up_path)
+            f_size = await aiopath.getsize(up_path)
             self._total_files += 1
             if f_size == 0:
                 LOGGER.error(
-                    f"{self._up_path} size is zero, telegram don't upload zero size files"
+                    f"{up_path} size is zero, telegram don't upload zero size files"
                 )
                 self._corrupted += 1
                 return
             if self._listener.is_cancelled:
                 return
-            cap_mono = await self._prepare_file(file_, dirpath)
-            if self._last_msg_in_group:
-                group_lists = [
-                    x for v in self._media_dict.values() for x in v.keys()
-                ]
-                match = re_match(r".+(?=\..+\.0*\d+$)|.+(?=\.part\d+\..+$)", f_path)
-                if not match or match and match.group(0) not in group_lists:
-                    for key, value in list(self._media_dict.items()):
-                        for subkey, msgs in list(value.items()):
-                            if len(msgs) > 1:
-                                await self._send_media_group(subkey, key, msgs)
-            if self._listener.hybrid_leech and self._listener.user_transmission or Config.USE_USER_SESSION_FOR_BIG_FILES:
-                self._user_session = f_size > 2097152000
-                if self._user_session:
-                    self._sent_msg = await TgClient.user.get_messages(
-                        chat_id=self._sent_msg.chat.id,
-                        message_ids=self._sent_msg.id,
-                    )
-                else:
-                    self._sent_msg = await self._listener.client.get_messages(
-                        chat_id=self._sent_msg.chat.id,
-                        message_ids=self._sent_msg.id,
-                    )
-            self._last_msg_in_group = False
-            self._last_uploaded = 0
-            async for sent_message in self._upload_file(cap_mono, file_, f_path):
-                if self._listener.is_cancelled:
-                    return
-                if sent_message:
-                    yield sent_message
-            if not self._is_corrupted:
-                if self._listener.is_super_chat or self._listener.up_dest and not self._is_private:
-                    self._msgs_dict[self._sent_msg.link] = file_
+            cap_mono, up_path = await self._prepare_file(file_, dirpath, up_path)
+            user_session = self._user_session
+            refetch = (
+                self._listener.hybrid_leech
+                and self._listener.user_transmission
+                or Config.USE_USER_SESSION_FOR_BIG_FILES
+            )
+            if refetch:
+                user_session = f_size > 2097152000
+            client = TgClient.user if user_session else self._listener.client
+            # only the bytes upload out of order, the message is sent in turn
+            self._last_uploaded[up_path] = 0
+            async with get_upload_slots():
+                preloaded = await client.preload_file(
+                    up_path,
+                    progress=self._upload_progress,
+                    progress_args=(up_path, client),
+                )
+            if self._listener.is_cancelled or not preloaded:
+                return
+            await turn.wait()
+            await self._flush_media_groups(f_path)
+            reply_to = self._sent_msg
+            if refetch:
+                reply_to = await client.get_messages(
+                    chat_id=reply_to.chat.id,
+                    message_ids=reply_to.id,
+                )
+            sent_msg = await self._upload_file(
+                cap_mono, file_, up_path, reply_to, client
+            )
+            if self._listener.is_cancelled or sent_msg is None:
+                return
+            self._sent_msg = sent_msg
+            await self._add_to_media_group(sent_msg, f_path)
+            if (
+                self._listener.is_super_chat
+                or self._listener.up_dest
+                and not self._is_private
+            ):
+                self._msgs_dict[sent_msg.link] = file_
             await sleep(1)
         except Exception as err:
             if isinstance(err, RetryError):
-                LOGGER.info(
-                    f"Total Attempts: {err.last_attempt.attempt_number}"
-                )
+                LOGGER.info(f"Total Attempts: {err.last_attempt.attempt_number}")
                 err = err.last_attempt.exception()
-            LOGGER.error(f"{err}. Path: {self._up_path}")
+            LOGGER.error(f"{err}. Path: {up_path}")
             self._error = str(err)
             self._corrupted += 1
             if self._listener.is_cancelled:
                 return
-        if not self._listener.is_cancelled and await aiopath.exists(
-            self._up_path
-        ):
-            await remove(self._up_path)
+        finally:
+            self._last_uploaded.pop(up_path, None)
+            if client is not None:
+                client.forget_file(up_path)
+        if not self._listener.is_cancelled and await aiopath.exists(up_path):
+            await remove(up_path)
 
     @retry(
         wait=wait_exponential(multiplier=2, min=4, max=8),
         stop=stop_after_attempt(3),
         retry=retry_if_exception_type(Exception),
     )
-    async def _upload_file(self, cap_mono, file, o_path, force_document=False):
+    async def _upload_file(
+        self, cap_mono, file, up_path, reply_to, client, force_document=False
+    ):
         if (
             self._thumb is not None
             and not await aiopath.exists(self._thumb)
@@ -367,9 +578,10 @@ class TelegramUploader:
         ):
             self._thumb = None
         thumb = self._thumb
-        self._is_corrupted = False
+        self._last_uploaded[up_path] = 0
+        progress_args = (up_path, client)
         try:
-            is_video, is_audio, is_image = await get_document_type(self._up_path)
+            is_video, is_audio, is_image = await get_document_type(up_path)
 
             if not is_image and thumb is None:
                 file_name = ospath.splitext(file)[0]
@@ -377,7 +589,7 @@ class TelegramUploader:
                 if await aiopath.isfile(thumb_path):
                     thumb = thumb_path
                 elif is_audio and not is_video:
-                    thumb = await get_audio_thumbnail(self._up_path)
+                    thumb = await get_audio_thumbnail(up_path)
 
             if (
                 self._listener.as_doc
@@ -386,32 +598,33 @@ class TelegramUploader:
             ):
                 key = "documents"
                 if is_video and thumb is None:
-                    thumb = await get_video_thumbnail(self._up_path, None)
+                    thumb = await get_video_thumbnail(up_path, None)
 
                 if self._listener.is_cancelled:
                     return
                 if thumb == "none":
                     thumb = None
-                self._sent_msg = await self._sent_msg.reply_document(
-                    document=self._up_path,
+                sent_msg = await reply_to.reply_document(
+                    document=up_path,
                     quote=True,
                     thumb=thumb,
                     caption=cap_mono,
                     force_document=True,
                     disable_notification=True,
                     progress=self._upload_progress,
+                    progress_args=progress_args,
                 )
             elif is_video:
                 key = "videos"
-                duration = (await get_media_info(self._up_path))[0]
+                duration = (await get_media_info(up_path))[0]
                 if thumb is None and self._listener.thumbnail_layout:
                     thumb = await get_multiple_frames_thumbnail(
-                        self._up_path,
+                        up_path,
                         self._listener.thumbnail_layout,
                         self._listener.screen_shots,
                     )
                 if thumb is None:
-                    thumb = await get_video_thumbnail(self._up_path, duration)
+                    thumb = await get_video_thumbnail(up_path, duration)
                 if thumb is not None and thumb != "none":
                     with Image.open(thumb) as img:
                         width, height = img.size
@@ -422,8 +635,8 @@ class TelegramUploader:
                     return
                 if thumb == "none":
                     thumb = None
-                self._sent_msg = await self._sent_msg.reply_video(
-                    video=self._up_path,
+                sent_msg = await reply_to.reply_video(
+                    video=up_path,
                     quote=True,
                     caption=cap_mono,
                     duration=duration,
@@ -433,16 +646,17 @@ class TelegramUploader:
                     supports_streaming=True,
                     disable_notification=True,
                     progress=self._upload_progress,
+                    progress_args=progress_args,
                 )
             elif is_audio:
                 key = "audios"
-                duration, artist, title = await get_media_info(self._up_path)
+                duration, artist, title = await get_media_info(up_path)
                 if self._listener.is_cancelled:
                     return
                 if thumb == "none":
                     thumb = None
-                self._sent_msg = await self._sent_msg.reply_audio(
-                    audio=self._up_path,
+                sent_msg = await reply_to.reply_audio(
+                    audio=up_path,
                     quote=True,
                     caption=cap_mono,
                     duration=duration,
@@ -451,49 +665,28 @@ class TelegramUploader:
                     thumb=thumb,
                     disable_notification=True,
                     progress=self._upload_progress,
+                    progress_args=progress_args,
                 )
             else:
                 key = "photos"
                 if self._listener.is_cancelled:
                     return
-                self._sent_msg = await self._sent_msg.reply_photo(
-                    photo=self._up_path,
+                sent_msg = await reply_to.reply_photo(
+                    photo=up_path,
                     quote=True,
                     caption=cap_mono,
                     disable_notification=True,
                     progress=self._upload_progress,
+                    progress_args=progress_args,
                 )
 
-            yield self._sent_msg
-
-            if (
-                not self._listener.is_cancelled
-                and self._media_group
-                and (self._sent_msg.video or self._sent_msg.document)
-            ):
-                key = "documents" if self._sent_msg.document else "videos"
-                if match := re_match(r".+(?=\.0*\d+$)|.+(?=\.part\d+\..+$)", o_path):
-                    pname = match.group(0)
-                    if pname in self._media_dict[key].keys():
-                        self._media_dict[key][pname].append(
-                            [self._sent_msg.chat.id, self._sent_msg.id]
-                        )
-                    else:
-                        self._media_dict[key][pname] = [
-                            [self._sent_msg.chat.id, self._sent_msg.id]
-                        ]
-                    msgs = self._media_dict[key][pname]
-                    if len(msgs) == 10:
-                        await self._send_media_group(pname, key, msgs)
-                    else:
-                        self._last_msg_in_group = True
-
             if (
                 self._thumb is None
                 and thumb is not None
                 and await aiopath.exists(thumb)
             ):
                 await remove(thumb)
+            return sent_msg
         except (FloodWait, FloodPremiumWait) as f:
             LOGGER.warning(str(f))
             await sleep(f.value * 1.3)
@@ -503,8 +696,7 @@ class TelegramUploader:
                 and await aiopath.exists(thumb)
             ):
                 await remove(thumb)
-            async for item in self._upload_file(cap_mono, file, o_path):
-                yield item
+            return await self._upload_file(cap_mono, file, up_path, reply_to, client)
         except Exception as err:
             if (
                 self._thumb is None
@@ -513,13 +705,13 @@ class TelegramUploader:
             ):
                 await remove(thumb)
             err_type = "RPCError: " if isinstance(err, RPCError) else ""
-            LOGGER.error(f"{err_type}{err}. Path: {self._up_path}")
+            LOGGER.error(f"{err_type}{err}. Path: {up_path}")
             if isinstance(err, BadRequest) and key != "documents":
-                LOGGER.error(f"Retrying As Document. Path: {self._up_path}")
-                async for item in self._upload_file(cap_mono, file, o_path, True):
-                    yield item
-            else:
-                raise err
+                LOGGER.error(f"Retrying As Document. Path: {up_path}")
+                return await self._upload_file(
+                    cap_mono, file, up_path, reply_to, client, True
+                )
+            raise err
 
     @property
     def speed(self):
@@ -532,7 +724,23 @@ class TelegramUploader:
     def processed_bytes(self):
         return self._processed_bytes
 
+    @property
+    def stages(self):
+        return " | ".join(
+            f"{stage} {done}/{total}"
+            for stage, (done, total) in self._stages.items()
+            if total
+        )
+
     async def cancel_task(self):
         self._listener.is_cancelled = True
+        if (
+            self._listener.subproc is not None
+            and self._listener.subproc.returncode is None
+        ):
+            try:
+                self._listener.subproc.kill()
+            except:
+                pass
         LOGGER.info(f"Cancelling Upload: {self._listener.name}")
         await self._listener.on_upload_error("your upload has been stopped!")
@@ -9,7 +9,7 @@ from ...core.config_manager import Config
 from ...core.mltb_client import TgClient
 from ..ext_utils.bot_utils import SetInterval
 from ..ext_utils.exceptions import TgLinkException
-from ..ext_utils.status_utils import get_readable_message
+from ..ext_utils.status_utils import get_readable_message, get_status_snapshot
 
 
 async def send_message(message, text, buttons=None, block=True):
@@ -80,7 +80,7 @@ async def send_rss(text, chat_id, thread_id):
     except (FloodWait, FloodPremiumWait) as f:
         LOGGER.warning(str(f))
         await sleep(f.value * 1.2)
-        return await send_rss(text)
+        return await send_rss(text, chat_id, thread_id)
     except Exception as e:
         LOGGER.error(str(e))
         return str(e)
@@ -184,14 +184,25 @@ async def temp_download(msg):
     return await msg.download(file_name=f"{path}/")
 
 
-async def update_status_message(sid, force=False):
+def start_status_updates(interval=None):
+    if st := intervals["status"]:
+        st.cancel()
+    intervals["status"] = SetInterval(
+        interval or Config.STATUS_UPDATE_INTERVAL, update_status_messages
+    )
+
+
+def stop_status_updates():
+    if st := intervals["status"]:
+        st.cancel()
+    intervals["status"] = ""
+
+
+async def update_status_message(sid, force=False, snapshot=None):
     if intervals["stopAll"]:
         return
     async with task_dict_lock:
         if not status_dict.get(sid):
-            if obj := intervals["status"].get(sid):
-                obj.cancel()
-                del intervals["status"][sid]
             return
         if not force and time() - status_dict[sid]["time"] < 3:
             return
@@ -201,24 +212,16 @@ async def update_status_message(sid, force=False):
         is_user = status_dict[sid]["is_user"]
         page_step = status_dict[sid]["page_step"]
         text, buttons = await get_readable_message(
-            sid, is_user, page_no, status, page_step
+            sid, is_user, page_no, status, page_step, snapshot
         )
         if text is None:
             del status_dict[sid]
-            if obj := intervals["status"].get(sid):
-                obj.cancel()
-                del intervals["status"][sid]
             return
         if text != status_dict[sid]["message"].text:
-            message = await edit_message(
-                status_dict[sid]["message"], text, buttons, block=False
-            )
+            message = await edit_message(status_dict[sid]["message"], text, buttons)
             if isinstance(message, str):
                 if message.startswith("Telegram says: [40"):
                     del status_dict[sid]
-                    if obj := intervals["status"].get(sid):
-                        obj.cancel()
-                        del intervals["status"][sid]
                 else:
                     LOGGER.error(
                         f"Status with id: {sid} haven't been updated. Error: {message}"
@@ -228,6 +231,22 @@ async def update_status_message(sid, force=False):
             status_dict[sid]["time"] = time()
 
 
+async def update_status_messages():
+    if intervals["stopAll"]:
+        return
+    async with task_dict_lock:
+        snapshot = await get_status_snapshot()
+    for sid, data in list(status_dict.items()):
+        if data["is_user"]:
+            continue
+        try:
+            await update_status_message(sid, snapshot=snapshot)
+        except Exception as e:
+            LOGGER.error(f"Status with id: {sid} haven't been updated. Error: {e}")
+    if all(data["is_user"] for data in status_dict.values()):
+        stop_status_updates()
+
+
 async def send_status_message(msg, user_id=0):
     if intervals["stopAll"]:
         return
@@ -243,9 +262,6 @@ async def send_status_message(msg, user_id=0):
             )
             if text is None:
                 del status_dict[sid]
-                if obj := intervals["status"].get(sid):
-                    obj.cancel()
-                    del intervals["status"][sid]
                 return
             old_message = status_dict[sid]["message"]
             message = await send_message(msg, text, buttons, block=False)
@@ -276,7 +292,5 @@ async def send_status_message(msg, user_id=0):
                 "status": "All",
                 "is_user": is_user,
             }
-        if not intervals["status"].get(sid) and not is_user:
-            intervals["status"][sid] = SetInterval(
-                Config.STATUS_UPDATE_INTERVAL, update_status_message, sid
-            )
+        if not intervals["status"] and not is_user:
+            start_status_updates()
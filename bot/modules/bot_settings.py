@@ -30,10 +30,7 @@ from .. import (
     auth_chats,
     sudo_users,
 )
-from ..helper.ext_utils.bot_utils import (
-    SetInterval,
-    new_task,
-)
+from ..helper.ext_utils.bot_utils import new_task
 from ..core.config_manager import Config
 from ..core.mltb_client import TgClient
 from ..core.torrent_manager import TorrentManager
@@ -41,13 +38,14 @@ from ..core.startup import update_qb_options, update_nzb_options, update_variabl
 from ..helper.ext_utils.db_handler import database
 from ..core.jdownloader_booter import jdownloader
 from ..helper.ext_utils.task_manager import start_from_queued
+from ..helper.mirror_leech_utils.gdrive_utils.drive_index import drive_index_booter
 from ..helper.mirror_leech_utils.rclone_utils.serve import rclone_serve_booter
 from ..helper.telegram_helper.button_build import ButtonMaker
 from ..helper.telegram_helper.message_utils import (
     send_message,
     send_file,
     edit_message,
-    update_status_message,
+    start_status_updates,
     delete_message,
 )
 from .rss import add_job
@@ -58,11 +56,19 @@ state = "view"
 handler_dict = {}
 DEFAULT_VALUES = {
     "LEECH_SPLIT_SIZE": TgClient.MAX_SPLIT_SIZE,
+    "LEECH_PARALLEL_UPLOADS": 1,
+    "LEECH_PROCESS_WORKERS": 1,
+    "DIRECT_PARALLEL_DOWNLOADS": 4,
+    "GDRIVE_UPLOAD_WORKERS": 4,
+    "LEECH_UPLOAD_CONNECTIONS": 1,
     "RSS_DELAY": 600,
     "STATUS_UPDATE_INTERVAL": 15,
+    "STATUS_SNAPSHOT_TTL": 1,
     "SEARCH_LIMIT": 0,
     "UPSTREAM_BRANCH": "master",
     "DEFAULT_UPLOAD": "rc",
+    "QUEUE_POLICY": "fair",
+    "ARCHIVE_PRESET": "store",
 }
 
 
@@ -249,12 +255,8 @@ async def edit_variable(_, message, pre_message, key):
             await database.trunc_table("tasks")
     elif key == "STATUS_UPDATE_INTERVAL":
         value = int(value)
-        if len(task_dict) != 0 and (st := intervals["status"]):
-            for cid, intvl in list(st.items()):
-                intvl.cancel()
-                intervals["status"][cid] = SetInterval(
-                    value, update_status_message, cid
-                )
+        if len(task_dict) != 0 and intervals["status"]:
+            start_status_updates(value)
     elif key == "TORRENT_TIMEOUT":
         await TorrentManager.change_aria2_option("bt-stop-timeout", value)
         value = int(value)
@@ -312,7 +314,13 @@ async def edit_variable(_, message, pre_message, key):
     await database.update_config({key: value})
     if key in ["SEARCH_PLUGINS", "SEARCH_API_LINK"]:
         await initiate_search_tools()
-    elif key in ["QUEUE_ALL", "QUEUE_DOWNLOAD", "QUEUE_UPLOAD"]:
+    elif key in [
+        "QUEUE_ALL",
+        "QUEUE_DOWNLOAD",
+        "QUEUE_UPLOAD",
+        "QUEUE_ENGINE_LIMITS",
+        "QUEUE_POLICY",
+    ]:
         await start_from_queued()
     elif key in [
         "RCLONE_SERVE_URL",
@@ -321,6 +329,8 @@ async def edit_variable(_, message, pre_message, key):
         "RCLONE_SERVE_PASS",
     ]:
         await rclone_serve_booter()
+    elif key in ["DRIVE_INDEX_INTERVAL", "GDRIVE_ID"]:
+        await drive_index_booter()
     elif key in ["JD_EMAIL", "JD_PASS"]:
         await jdownloader.boot()
     elif key == "RSS_DELAY":
@@ -577,13 +587,9 @@ async def edit_bot_settings(client, query):
             if (
                 data[2] == "STATUS_UPDATE_INTERVAL"
                 and len(task_dict) != 0
-                and (st := intervals["status"])
+                and intervals["status"]
             ):
-                for key, intvl in list(st.items()):
-                    intvl.cancel()
-                    intervals["status"][key] = SetInterval(
-                        value, update_status_message, key
-                    )
+                start_status_updates(value)
         elif data[2] == "EXCLUDED_EXTENSIONS":
             excluded_extensions.clear()
             excluded_extensions.extend(["aria2", "!qB"])
@@ -627,7 +633,13 @@ async def edit_bot_settings(client, query):
         await database.update_config({data[2]: value})
         if data[2] in ["SEARCH_PLUGINS", "SEARCH_API_LINK"]:
             await initiate_search_tools()
-        elif data[2] in ["QUEUE_ALL", "QUEUE_DOWNLOAD", "QUEUE_UPLOAD"]:
+        elif data[2] in [
+            "QUEUE_ALL",
+            "QUEUE_DOWNLOAD",
+            "QUEUE_UPLOAD",
+            "QUEUE_ENGINE_LIMITS",
+            "QUEUE_POLICY",
+        ]:
             await start_from_queued()
         elif data[2] in [
             "RCLONE_SERVE_URL",
@@ -636,6 +648,8 @@ async def edit_bot_settings(client, query):
             "RCLONE_SERVE_PASS",
         ]:
             await rclone_serve_booter()
+        elif data[2] == "DRIVE_INDEX_INTERVAL":
+            await drive_index_booter()
     elif data[1] == "resetnzb":
         await query.answer()
         res = await sabnzbd_client.set_config_default(data[2])
@@ -842,12 +856,8 @@ async def load_config():
     if not await aiopath.exists("accounts"):
         Config.USE_SERVICE_ACCOUNTS = False
 
-    if len(task_dict) != 0 and (st := intervals["status"]):
-        for key, intvl in list(st.items()):
-            intvl.cancel()
-            intervals["status"][key] = SetInterval(
-                Config.STATUS_UPDATE_INTERVAL, update_status_message, key
-            )
+    if len(task_dict) != 0 and intervals["status"]:
+        start_status_updates()
 
     if Config.TORRENT_TIMEOUT:
         await TorrentManager.change_aria2_option(
@@ -870,5 +880,10 @@ async def load_config():
         await database.update_config(config_dict)
     else:
         await database.disconnect()
-    await gather(initiate_search_tools(), start_from_queued(), rclone_serve_booter())
+    await gather(
+        initiate_search_tools(),
+        start_from_queued(),
+        rclone_serve_booter(),
+        drive_index_booter(),
+    )
     add_job()
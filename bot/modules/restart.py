@@ -100,8 +100,7 @@ async def confirm_restart(_, query):
         if nzb := intervals["nzb"]:
             nzb.cancel()
         if st := intervals["status"]:
-            for intvl in list(st.values()):
-                intvl.cancel()
+            st.cancel()
         await clean_all()
         await TorrentManager.close_all()
         if sabnzbd_client.LOGGED_IN:
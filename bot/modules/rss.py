@@ -1,21 +1,21 @@
-from httpx import AsyncClient
+from httpx import AsyncClient, Limits
 from apscheduler.triggers.interval import IntervalTrigger
-from asyncio import Lock, sleep
+from asyncio import Lock, Queue, Semaphore, gather, sleep
 from datetime import datetime, timedelta
 from feedparser import parse as feed_parse
-from functools import partial
+from functools import lru_cache, partial
 from io import BytesIO
 from pyrogram.filters import create
 from pyrogram.handlers import MessageHandler
 from time import time
-from re import compile, I
+from re import compile, escape, I
+from urllib.parse import urlparse
 
-from .. import scheduler, rss_dict, LOGGER
+from .. import scheduler, rss_dict, LOGGER, bot_loop
 from ..core.config_manager import Config
 from ..helper.ext_utils.bot_utils import new_task, arg_parser, get_size_bytes
 from ..helper.ext_utils.status_utils import get_readable_file_size
 from ..helper.ext_utils.db_handler import database
-from ..helper.ext_utils.exceptions import RssShutdownException
 from ..helper.ext_utils.help_messages import RSS_HELP_MESSAGE
 from ..helper.telegram_helper.button_build import ButtonMaker
 from ..helper.telegram_helper.filters import CustomFilters
@@ -29,6 +29,15 @@ from ..helper.telegram_helper.message_utils import (
 
 rss_dict_lock = Lock()
 handler_dict = {}
+RSS_HOST_CONNECTIONS = 4
+RSS_SEND_DELAY = 3
+host_limits = {}
+feed_validators = {}
+pending_validators = {}
+rss_stats = {}
+_client = None
+_send_queue = Queue()
+_sender = None
 size_regex = compile(r"(\d+(\.\d+)?\s?(GB|MB|KB|GiB|MiB|KiB))", I)
 
 headers = {
@@ -38,6 +47,56 @@ headers = {
 }
 
 
+@lru_cache(maxsize=1024)
+def _compile_filter(inf, exf, sensitive):
+    flags = I if sensitive else 0
+    inf_res = [compile("|".join(escape(x) for x in flist), flags) for flist in inf]
+    exf_words = [escape(x) for flist in exf for x in flist]
+    exf_re = compile("|".join(exf_words), flags) if exf_words else None
+
+    def matcher(item_title):
+        return all(r.search(item_title) for r in inf_res) and not (
+            exf_re and exf_re.search(item_title)
+        )
+
+    return matcher
+
+
+def compile_filter(data):
+    return _compile_filter(
+        tuple(tuple(flist) for flist in data["inf"]),
+        tuple(tuple(flist) for flist in data["exf"]),
+        data.get("sensitive", False),
+    )
+
+
+def queue_rss(text, chat_id, thread_id):
+    global _sender
+    _send_queue.put_nowait((text, chat_id, thread_id))
+    if _sender is None or _sender.done():
+        _sender = bot_loop.create_task(_rss_sender())
+
+
+async def _rss_sender():
+    while not _send_queue.empty():
+        text, chat_id, thread_id = _send_queue.get_nowait()
+        await send_rss(text, chat_id, thread_id)
+        await sleep(RSS_SEND_DELAY)
+
+
+def _get_client():
+    global _client
+    if _client is None:
+        _client = AsyncClient(
+            headers=headers,
+            follow_redirects=True,
+            timeout=60,
+            verify=False,
+            limits=Limits(max_connections=50, max_keepalive_connections=20),
+        )
+    return _client
+
+
 async def rss_menu(event):
     user_id = event.from_user.id
     buttons = ButtonMaker()
@@ -61,6 +120,8 @@ async def rss_menu(event):
     buttons.data_button("Close", f"rss close {user_id}")
     button = buttons.build_menu(2)
     msg = f"Rss Menu | Users: {len(rss_dict)} | Running: {scheduler.running}"
+    if saved := sum(stats["saved"] for stats in rss_stats.values()):
+        msg += f" | Saved: {get_readable_file_size(saved)}"
     return msg, button
 
 
@@ -133,10 +194,7 @@ async def rss_sub(_, message, pre_event):
             cmd = None
             stv = False
         try:
-            async with AsyncClient(
-                headers=headers, follow_redirects=True, timeout=60, verify=False
-            ) as client:
-                res = await client.get(feed_link)
+            res = await _get_client().get(feed_link)
             html = res.text
             rss_d = feed_parse(html)
             last_title = rss_d.entries[0]["title"]
@@ -276,6 +334,16 @@ async def rss_update(_, message, pre_event, state):
     await update_rss_menu(pre_event)
 
 
+def feed_stats(link):
+    if not (stats := rss_stats.get(link)) or "latency" not in stats:
+        return ""
+    return (
+        f"<b>Last Fetch:</b> <code>{stats['latency']:.2f}s</code> | "
+        f"<b>Not Modified:</b> <code>{stats['not_modified']}</code> | "
+        f"<b>Saved:</b> <code>{get_readable_file_size(stats['saved'])}</code>\n"
+    )
+
+
 async def rss_list(query, start, all_users=False):
     user_id = query.from_user.id
     buttons = ButtonMaker()
@@ -295,6 +363,7 @@ async def rss_list(query, start, all_users=False):
                     list_feed += f"<b>Exf:</b> <code>{data['exf']}</code>\n"
                     list_feed += f"<b>Sensitive:</b> <code>{data.get('sensitive', False)}</code>\n"
                     list_feed += f"<b>Paused:</b> <code>{data['paused']}</code>\n"
+                    list_feed += feed_stats(data["link"])
                     list_feed += f"<b>User:</b> {data['tag'].replace('@', '', 1)}"
                     index += 1
                     if index == 5:
@@ -312,6 +381,7 @@ async def rss_list(query, start, all_users=False):
                     f"<b>Sensitive:</b> <code>{data.get('sensitive', False)}</code>\n"
                 )
                 list_feed += f"<b>Paused:</b> <code>{data['paused']}</code>\n"
+                list_feed += feed_stats(data["link"])
     buttons.data_button("Back", f"rss back {user_id}")
     buttons.data_button("Close", f"rss close {user_id}")
     if keysCount > 5:
@@ -346,10 +416,7 @@ async def rss_get(_, message, pre_event):
                 msg = await send_message(
                     message, f"Getting the last <b>{count}</b> item(s) from {title}"
                 )
-                async with AsyncClient(
-                    headers=headers, follow_redirects=True, timeout=60, verify=False
-                ) as client:
-                    res = await client.get(data["link"])
+                res = await _get_client().get(data["link"])
                 html = res.text
                 rss_d = feed_parse(html)
                 item_info = ""
@@ -658,6 +725,44 @@ Timeout: 60 sec. Argument -c for command and arguments
             await query.answer(text="Already Running!", show_alert=True)
 
 
+async def _fetch_feed(link):
+    host = urlparse(link).netloc
+    if host not in host_limits:
+        host_limits[host] = Semaphore(RSS_HOST_CONNECTIONS)
+    req_headers = {}
+    if validators := feed_validators.get(link):
+        if validators.get("etag"):
+            req_headers["If-None-Match"] = validators["etag"]
+        if validators.get("modified"):
+            req_headers["If-Modified-Since"] = validators["modified"]
+    tries = 0
+    async with host_limits[host]:
+        while True:
+            try:
+                start_time = time()
+                res = await _get_client().get(link, headers=req_headers)
+                break
+            except:
+                tries += 1
+                if tries > 3:
+                    raise
+    stats = rss_stats.setdefault(link, {"saved": 0, "not_modified": 0})
+    stats["latency"] = time() - start_time
+    if res.status_code == 304 and validators:
+        stats["bytes"] = 0
+        stats["not_modified"] += 1
+        stats["saved"] += validators["size"]
+        return None
+    res.raise_for_status()
+    stats["bytes"] = len(res.content)
+    pending_validators[link] = {
+        "etag": res.headers.get("ETag"),
+        "modified": res.headers.get("Last-Modified"),
+        "size": len(res.content),
+    }
+    return res.text
+
+
 async def rss_monitor():
     chat = Config.RSS_CHAT
     if not chat:
@@ -680,44 +785,40 @@ async def rss_monitor():
         )
     elif chat.lstrip("-").isdigit():
         rss_chat_id = int(chat)
+    links = list(
+        {
+            data["link"]
+            for items in list(rss_dict.values())
+            for data in list(items.values())
+            if not data["paused"]
+        }
+    )
+    results = await gather(
+        *(_fetch_feed(link) for link in links), return_exceptions=True
+    )
+    feeds = dict(zip(links, results))
+    failed_links = set()
     for user, items in list(rss_dict.items()):
         for title, data in items.items():
             try:
-                if data["paused"]:
+                if data["paused"] or data["link"] not in feeds:
+                    continue
+                if isinstance(html := feeds[data["link"]], Exception):
+                    raise html
+                all_paused = False
+                if html is None:
                     continue
-                tries = 0
-                while True:
-                    try:
-                        async with AsyncClient(
-                            headers=headers,
-                            follow_redirects=True,
-                            timeout=60,
-                            verify=False,
-                        ) as client:
-                            res = await client.get(data["link"])
-                        html = res.text
-                        break
-                    except:
-                        tries += 1
-                        if tries > 3:
-                            raise
-                        continue
                 rss_d = feed_parse(html)
                 try:
                     last_link = rss_d.entries[0]["links"][1]["href"]
                 except IndexError:
                     last_link = rss_d.entries[0]["link"]
-                finally:
-                    all_paused = False
                 last_title = rss_d.entries[0]["title"]
                 if data["last_feed"] == last_link or data["last_title"] == last_title:
                     continue
                 feed_count = 0
+                matcher = compile_filter(data)
                 while True:
-                    try:
-                        await sleep(10)
-                    except:
-                        raise RssShutdownException("Rss Monitor Stopped!")
                     try:
                         item_title = rss_d.entries[feed_count]["title"]
                         try:
@@ -740,32 +841,8 @@ async def rss_monitor():
                             f"Reached Max index no. {feed_count} for this feed: {title}. Maybe you need to use less RSS_DELAY to not miss some torrents"
                         )
                         break
-                    parse = True
-                    for flist in data["inf"]:
-                        if (
-                            data.get("sensitive", False)
-                            and all(x.lower() not in item_title.lower() for x in flist)
-                        ) or (
-                            not data.get("sensitive", False)
-                            and all(x not in item_title for x in flist)
-                        ):
-                            parse = False
-                            feed_count += 1
-                            break
-                    if not parse:
-                        continue
-                    for flist in data["exf"]:
-                        if (
-                            data.get("sensitive", False)
-                            and any(x.lower() in item_title.lower() for x in flist)
-                        ) or (
-                            not data.get("sensitive", False)
-                            and any(x in item_title for x in flist)
-                        ):
-                            parse = False
-                            feed_count += 1
-                            break
-                    if not parse:
+                    if not matcher(item_title):
+                        feed_count += 1
                         continue
                     if command := data["command"]:
                         if (
@@ -788,7 +865,7 @@ async def rss_monitor():
                     feed_msg += (
                         f"\n<b>Tag: </b><code>{data['tag']}</code> <code>{user}</code>"
                     )
-                    await send_rss(feed_msg, rss_chat_id, rss_topic_id)
+                    queue_rss(feed_msg, rss_chat_id, rss_topic_id)
                     feed_count += 1
                 async with rss_dict_lock:
                     if user not in rss_dict or not rss_dict[user].get(title, False):
@@ -799,12 +876,13 @@ async def rss_monitor():
                 await database.rss_update(user)
                 LOGGER.info(f"Feed Name: {title}")
                 LOGGER.info(f"Last item: {last_link}")
-            except RssShutdownException as ex:
-                LOGGER.info(ex)
-                break
             except Exception as e:
+                failed_links.add(data["link"])
                 LOGGER.error(f"{e} - Feed Name: {title} - Feed Link: {data['link']}")
                 continue
+    for link in links:
+        if link not in failed_links and link in pending_validators:
+            feed_validators[link] = pending_validators.pop(link)
     if all_paused:
         scheduler.pause()
 
@@ -7,7 +7,6 @@ from .. import (
     status_dict,
     task_dict,
     bot_start_time,
-    intervals,
     sabnzbd_client,
     DOWNLOAD_DIR,
 )
@@ -52,10 +51,6 @@ async def task_status(_, message):
             user_id = message.from_user.id if text[1] == "me" else int(text[1])
         else:
             user_id = 0
-            sid = message.chat.id
-            if obj := intervals["status"].get(sid):
-                obj.cancel()
-                del intervals["status"][sid]
         await send_status_message(message, user_id)
         await delete_message(message)
 
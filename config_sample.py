@@ -13,9 +13,12 @@ DATABASE_URL = ""
 STATUS_LIMIT = 4
 DEFAULT_UPLOAD = "rc"
 STATUS_UPDATE_INTERVAL = 15
+STATUS_SNAPSHOT_TTL = 1
 FILELION_API = ""
 STREAMWISH_API = ""
 EXCLUDED_EXTENSIONS = ""
+ARCHIVE_PRESET = "store"
+ARCHIVE_THREADS = 0
 INCOMPLETE_TASK_NOTIFIER = False
 YT_DLP_OPTIONS = ""
 USE_SERVICE_ACCOUNTS = False
@@ -24,12 +27,15 @@ FFMPEG_CMDS = {}
 UPLOAD_PATHS = {}
 # GDrive Tools
 GDRIVE_ID = ""
+GDRIVE_UPLOAD_WORKERS = 4
+DRIVE_INDEX_INTERVAL = 0
 IS_TEAM_DRIVE = False
 STOP_DUPLICATE = False
 INDEX_URL = ""
 # Rclone
 RCLONE_PATH = ""
 RCLONE_FLAGS = ""
+RCLONE_RCD = False
 RCLONE_SERVE_URL = ""
 RCLONE_SERVE_PORT = 0
 RCLONE_SERVE_USER = ""
@@ -74,8 +80,14 @@ HYBRID_LEECH = False
 LEECH_FILENAME_PREFIX = ""
 LEECH_DUMP_CHAT = ""
 THUMBNAIL_LAYOUT = ""
+LEECH_PARALLEL_UPLOADS = 1
+LEECH_PROCESS_WORKERS = 1
+LEECH_GLOBAL_UPLOADS = 0
+LEECH_UPLOAD_CONNECTIONS = 1
+STREAM_LEECH = False
 # qBittorrent/Aria2c
 TORRENT_TIMEOUT = 0
+DIRECT_PARALLEL_DOWNLOADS = 4
 BASE_URL = ""
 BASE_URL_PORT = 0
 WEB_PINCODE = False
@@ -83,6 +95,8 @@ WEB_PINCODE = False
 QUEUE_ALL = 0
 QUEUE_DOWNLOAD = 0
 QUEUE_UPLOAD = 0
+QUEUE_POLICY = "fair"
+QUEUE_ENGINE_LIMITS = {}
 # RSS
 RSS_DELAY = 600
 RSS_CHAT = ""
@@ -682,6 +682,43 @@ class Captcha:
         return await self.device.action(f"{self.url}/solve", (captcha_id, solution))
 
 
+class Events:
+
+    def __init__(self, device):
+        self.device = device
+        self.url = "/events"
+
+    async def subscribe(self, subscriptions, exclusions=None):
+        """
+        Subscribe to events whose "publisher.eventid" matches one of the
+        subscriptions regexes and none of the exclusions
+
+        :return: {"subscriptionid": int, "subscribed": bool, ...}
+        """
+        params = [subscriptions, exclusions or []]
+        return await self.device.action(f"{self.url}/subscribe", params)
+
+    async def change_subscription_timeouts(
+        self, subscription_id, poll_timeout, max_keepalive
+    ):
+        params = [subscription_id, poll_timeout, max_keepalive]
+        return await self.device.action(
+            f"{self.url}/changesubscriptiontimeouts", params
+        )
+
+    async def listen(self, subscription_id):
+        """
+        Long-poll the events of a subscription, returns once events are queued
+        or the poll timeout passes
+
+        :return: [{"publisher": str, "eventid": str, "eventData": dict}, ...]
+        """
+        return await self.device.action(f"{self.url}/listen", [subscription_id])
+
+    async def unsubscribe(self, subscription_id):
+        return await self.device.action(f"{self.url}/unsubscribe", [subscription_id])
+
+
 class Jddevice:
 
     def __init__(self, jd):
@@ -696,6 +733,7 @@ class Jddevice:
         self.captcha = Captcha(self)
         self.downloads = Downloads(self)
         self.downloadcontroller = DownloadController(self)
+        self.events = Events(self)
         self.extensions = Extension(self)
         self.jd = Jd(self)
         self.system = System(self)